@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple, Union
 
 import torch
 from torch import Tensor, nn
@@ -20,31 +20,146 @@ class HCSEMixin(nn.Module):
             raise ValueError("hidden_size must be provided to HCSEMixin")
         self.info_nce_head = nn.Linear(int(hidden_size), int(hidden_size), bias=False)
 
-    def compute_hcse_surrogates(self, hidden_states: Tensor) -> Tuple[Tensor, Tensor, Tensor]:
+    def compute_hcse_surrogates(
+        self,
+        hidden_states: Tensor,
+        hcse_params: Optional[Dict[str, Any]] = None,
+        attention_mask: Optional[Tensor] = None,
+        timer: Optional[PhaseTimer] = None,
+    ) -> Tuple[Tensor, Tensor, Tensor]:
         """Compute HCSE surrogates for a layer's hidden states.
 
         The input tensor is flattened across batch and sequence dimensions so
-        that each row corresponds to a single activation vector. Integration
-        efficiency is measured with an InfoNCE head, connectivity density uses
-        the absolute off-diagonal correlations, and activation energy is the
-        mean squared value.
+        that each row corresponds to a single activation vector. A 4D input
+        ``(layers, batch, seq, hidden)`` is treated as a stack of layers and
+        all of them are scored in one batched pass, returning surrogates of
+        shape ``(layers,)``. Integration efficiency is measured with an
+        InfoNCE head, connectivity density uses the absolute off-diagonal
+        correlations, and activation energy is the mean squared value.
+
+        Options read from ``hcse_params``:
+
+        - ``rho_block_size`` computes ρ in column tiles without building the
+          full correlation matrix; ``infonce_block_size`` streams the InfoNCE
+          logits in row blocks; ``infonce_max_tokens`` caps the rows used for
+          η by deterministic strided subsampling.
+        - ``distributed`` computes the surrogates over the global batch when
+          a multi-rank process group is active (see :mod:`hcse.distributed`);
+          only ``infonce_max_tokens`` of the other options then applies.
+        - ``fused`` computes ρ and Ė together with
+          :func:`~hcse.utils.fused_statistics`; ``compile`` additionally wraps
+          that kernel with ``torch.compile``, falling back to eager. The
+          kernel builds the full correlation matrix, so ``fused`` raises
+          ``ValueError`` together with ``rho_block_size`` or
+          ``rho_sketch_size``.
+        - ``rho_sketch_size`` replaces the exact ρ with a column-sampling
+          estimate (see :func:`~hcse.utils.sketch_connectivity_density`).
+          The generator is seeded once from ``rho_sketch_seed``, so every
+          call draws new columns but runs are reproducible.
+        - ``precision="mixed"`` keeps bf16/fp16 activations in their dtype
+          but accumulates every statistic in fp32 (see
+          :func:`~hcse.utils.stable_statistics`) and returns fp32
+          surrogates. It honours ``rho_block_size`` and ``rho_sketch_size``
+          but raises ``ValueError`` together with ``fused`` or ``compile``.
+
+        When a ``(batch, seq)`` ``attention_mask`` is given, only the tokens
+        where it is non-zero are packed into the rows, so padding neither
+        costs compute nor skews the surrogates.
+
+        A :class:`~hcse.instrumentation.PhaseTimer` passed as ``timer``
+        records the projection, InfoNCE and correlation phases.
         """
+        hcse_params = hcse_params or {}
         if hidden_states.dim() == 2:
             flat = hidden_states
+        elif attention_mask is not None:
+            # boolean indexing packs the valid (batch, seq) positions
+            valid = attention_mask.to(device=hidden_states.device, dtype=torch.bool)
+            if hidden_states.dim() == 4:
+                flat = hidden_states[:, valid]
+            else:
+                flat = hidden_states[valid]
+        elif hidden_states.dim() == 4:
+            layers, b, t, n = hidden_states.shape
+            flat = hidden_states.reshape(layers, b * t, n)
         else:
             b, t, n = hidden_states.shape
             flat = hidden_states.reshape(b * t, n)
-        n = flat.shape[1]
         # eta via InfoNCE head
-        features = self.info_nce_head(flat)
-        eta = info_nce_loss(features)
+        tokens = subsample_rows(flat, hcse_params.get("infonce_max_tokens"))
+        with hcse_phase(timer, "projection"):
+            features = self.info_nce_head(tokens)
+        distributed = hcse_params.get("distributed", False) and is_distributed()
+        mixed = hcse_params.get("precision") == "mixed"
+        block_size = hcse_params.get("infonce_block_size")
+        with hcse_phase(timer, "infonce"):
+            if distributed:
+                eta = distributed_info_nce_loss(features)
+            elif mixed:
+                # the row-block path accumulates the InfoNCE terms in fp32
+                eta = info_nce_loss(features, block_size=block_size or features.shape[-2])
+            else:
+                eta = info_nce_loss(features, block_size=block_size)
+        with hcse_phase(timer, "corrcoef"):
+            rho, e_dot = self._hcse_statistics(flat, hcse_params, distributed, mixed)
+        return eta, rho, e_dot
+
+    def _hcse_statistics(
+        self,
+        flat: Tensor,
+        hcse_params: Dict[str, Any],
+        distributed: bool,
+        mixed: bool,
+    ) -> Tuple[Tensor, Tensor]:
+        """Connectivity density and activation energy of the packed rows."""
+        if distributed:
+            return distributed_connectivity_density(flat), distributed_energy(flat)
+        block_size = hcse_params.get("rho_block_size")
+        sketch_size = hcse_params.get("rho_sketch_size")
+        if mixed:
+            if hcse_params.get("fused", False) or hcse_params.get("compile", False):
+                raise ValueError(
+                    'precision="mixed" already computes rho and E_dot in one pass; '
+                    "drop fused/compile"
+                )
+            if not sketch_size:
+                return stable_statistics(flat, block_size=block_size)
+            rho = sketch_connectivity_density(
+                flat,
+                sketch_size,
+                generator=self._hcse_sketch_generator(hcse_params.get("rho_sketch_seed", 0)),
+                block_size=block_size,
+                density=stable_connectivity_density,
+            )
+            acc = torch.promote_types(flat.dtype, torch.float32)
+            energy = torch.linalg.vector_norm(flat, dim=(-2, -1), dtype=acc).pow(2)
+            return rho, energy / (flat.shape[-2] * flat.shape[-1])
+        if hcse_params.get("fused", False):
+            if block_size or sketch_size:
+                raise ValueError(
+                    "fused builds the full correlation matrix; drop rho_block_size/rho_sketch_size"
+                )
+            stats = compiled_fused_statistics if hcse_params.get("compile", False) else fused_statistics
+            return stats(flat)
         # rho: mean absolute off-diagonal correlation
-        corr = corrcoef(flat)
-        off_diag = corr - torch.diag_embed(torch.diagonal(corr))
-        rho = off_diag.abs().mean()
+        if sketch_size:
+            rho = sketch_connectivity_density(
+                flat,
+                sketch_size,
+                generator=self._hcse_sketch_generator(hcse_params.get("rho_sketch_seed", 0)),
+                block_size=block_size,
+            )
+        else:
+            rho = connectivity_density(flat, block_size=block_size)
         # E_dot: mean squared activation
-        e_dot = flat.pow(2).mean()
-        return eta, rho, e_dot
+        e_dot = flat.pow(2).mean(dim=(-2, -1))
+        return rho, e_dot
+
+    def _hcse_sketch_generator(self, seed: int) -> torch.Generator:
+        generators: Dict[int, torch.Generator] = self.__dict__.setdefault("_hcse_generators", {})
+        if seed not in generators:
+            generators[seed] = torch.Generator().manual_seed(seed)
+        return generators[seed]
 
     def compute_hcse_bonus(
         self,
@@ -53,33 +168,152 @@ class HCSEMixin(nn.Module):
         gamma: float,
         delta: float,
         lambda_c: float,
+        hcse_params: Optional[Dict[str, Any]] = None,
+        attention_mask: Optional[Tensor] = None,
+    ) -> Tensor:
+        """Compute HCSE bonus term given hidden states and coefficients.
+
+        The explicit coefficients override those in ``hcse_params``; the
+        remaining options (``precision``, ``layer_weights``, ...) apply as in
+        :meth:`hcse_bonus_from_surrogates`.
+        """
+        params = {
+            **(hcse_params or {}),
+            "beta": beta,
+            "gamma": gamma,
+            "delta": delta,
+            "lambda_c": lambda_c,
+        }
+        surrogates = self.compute_hcse_surrogates(hidden_states, params, attention_mask)
+        return self.hcse_bonus_from_surrogates(*surrogates, params)
+
+    def hcse_bonus_from_surrogates(
+        self,
+        eta: Tensor,
+        rho: Tensor,
+        e_dot: Tensor,
+        hcse_params: Dict[str, Any],
     ) -> Tensor:
-        """Compute HCSE bonus term given hidden states and coefficients."""
-        eta, rho, e_dot = self.compute_hcse_surrogates(hidden_states)
-        bonus = torch.log1p(eta.pow(beta) * rho.pow(gamma) * e_dot.pow(delta))
-        return lambda_c * bonus
+        """Scalar bonus for surrogates using the coefficients in ``hcse_params``.
+
+        Per-layer surrogates of shape ``(layers,)`` are combined with
+        ``layer_weights`` (equal weights summing to one by default). With
+        ``precision="mixed"`` the bonus is evaluated in log-space.
+        """
+        bonus_fn = _log_space_bonus if hcse_params.get("precision") == "mixed" else _hcse_bonus
+        bonus = bonus_fn(
+            eta,
+            rho,
+            e_dot,
+            hcse_params.get("beta", 1.0),
+            hcse_params.get("gamma", 1.0),
+            hcse_params.get("delta", 1.0),
+            hcse_params.get("lambda_c", 1.0),
+        )
+        if bonus.dim() == 0:
+            return bonus
+        layers = bonus.shape[0]
+        weights = hcse_params.get("layer_weights") or [1.0 / layers] * layers
+        if len(weights) != layers:
+            raise ValueError("layer_weights must have one entry per layer")
+        return (bonus * bonus.new_tensor(weights)).sum()
 
     def compute_loss(self, loss: Tensor, bonus: Tensor) -> Tensor:  # type: ignore[override]
         """Combine original loss with HCSE bonus."""
         return loss - bonus
 
+    def hcse_layer_module(self, layer: Union[int, str]) -> nn.Module:
+        """Return the submodule whose output corresponds to ``layer``.
+
+        A string is looked up with ``get_submodule``. An integer indexes
+        ``hidden_states`` as returned with ``output_hidden_states=True``:
+        entry 0 is the embedding output and entry ``i`` the output of
+        transformer block ``i - 1``, where the blocks are the model's
+        largest ``nn.ModuleList``.
+
+        Only ``1 <= layer < len(blocks)`` is accepted. The last entry of
+        ``hidden_states`` is taken after the model's final norm, which a hook
+        on the last block would miss, so negative indices and the last
+        index raise ``ValueError``; pass the name of the final norm (or of
+        the block) instead.
+        """
+        if isinstance(layer, str):
+            return self.get_submodule(layer)
+        lists = [m for m in self.modules() if isinstance(m, nn.ModuleList)]
+        blocks = max(lists, key=len) if lists else nn.ModuleList()
+        if not 1 <= layer < len(blocks):
+            raise ValueError(
+                f"cannot map layer {layer} to a module; the embedding output and the "
+                "last hidden state (after the final norm) need a submodule name, "
+                "e.g. 'model.norm'"
+            )
+        return blocks[layer - 1]
+
     def forward_with_hcse(
         self,
         *args: Any,
         hcse_params: Dict[str, Any],
         **kwargs: Any,
     ) -> Any:
-        """Forward pass that applies HCSE bonus to the loss."""
+        """Forward pass that applies HCSE bonus to the loss.
+
+        By default the model is run with ``output_hidden_states=True``. With
+        ``hcse_params["capture"] == "hook"`` only the configured layers are
+        captured through forward hooks (see :meth:`hcse_layer_module`), so
+        the other layers' activations are freed as usual.
+
+        ``hcse_params["layer"]`` may be a list of layers. Their hidden states
+        are stacked and scored in one batched pass, and the per-layer bonuses
+        are combined with ``layer_weights`` (equal weights summing to one by
+        default).
+
+        An ``attention_mask`` keyword argument is forwarded to the surrogates
+        so that padded positions are skipped; set
+        ``hcse_params["mask_padding"] = False`` to score every position.
+
+        The detached ``(eta, rho, e_dot)`` are attached to the outputs as
+        ``hcse_surrogates``; in distributed mode they are the global values.
+        With ``hcse_params["instrument"]`` the per-phase wall-clock times
+        (and peak memory on CUDA) are attached as ``hcse_timings``;
+        ``hcse_params["profile"]`` additionally annotates each phase for
+        ``torch.profiler``.
+        """
         layer = hcse_params.get("layer", -1)
-        beta = hcse_params.get("beta", 1.0)
-        gamma = hcse_params.get("gamma", 1.0)
-        delta = hcse_params.get("delta", 1.0)
-        lambda_c = hcse_params.get("lambda_c", 1.0)
+        layers = list(layer) if isinstance(layer, (list, tuple)) else [layer]
 
-        outputs = super().forward(*args, output_hidden_states=True, **kwargs)
+        if hcse_params.get("capture", "hidden_states") == "hook":
+            captured: Dict[int, Tensor] = {}
+            handles = []
+            for position, name in enumerate(layers):
+
+                def hook(
+                    module: nn.Module, inputs: Any, output: Any, position: int = position
+                ) -> None:
+                    captured[position] = output[0] if isinstance(output, tuple) else output
+
+                handles.append(self.hcse_layer_module(name).register_forward_hook(hook))
+            try:
+                outputs = super().forward(*args, **kwargs)
+            finally:
+                for handle in handles:
+                    handle.remove()
+            selected = [captured[position] for position in range(len(layers))]
+        else:
+            outputs = super().forward(*args, output_hidden_states=True, **kwargs)
+            selected = [outputs.hidden_states[index] for index in layers]
         loss = outputs.loss if hasattr(outputs, "loss") else None
-        hidden_states = outputs.hidden_states[layer]
-        bonus = self.compute_hcse_bonus(hidden_states, beta, gamma, delta, lambda_c)
+        mask = kwargs.get("attention_mask") if hcse_params.get("mask_padding", True) else None
+
+        hidden_states = torch.stack(selected) if isinstance(layer, (list, tuple)) else selected[0]
+        timer = PhaseTimer.from_params(hcse_params, hidden_states.device)
+        surrogates = self.compute_hcse_surrogates(
+            hidden_states, hcse_params, attention_mask=mask, timer=timer
+        )
+        with hcse_phase(timer, "bonus"):
+            bonus = self.hcse_bonus_from_surrogates(*surrogates, hcse_params)
+        setattr(outputs, "hcse_surrogates", tuple(value.detach() for value in surrogates))
+        if timer is not None:
+            setattr(outputs, "hcse_timings", timer.metrics())
 
         if loss is not None:
             loss = self.compute_loss(loss, bonus)
@@ -87,7 +321,58 @@ class HCSEMixin(nn.Module):
         return outputs
 
 
+def _hcse_bonus(
+    eta: Tensor,
+    rho: Tensor,
+    e_dot: Tensor,
+    beta: float,
+    gamma: float,
+    delta: float,
+    lambda_c: float,
+) -> Tensor:
+    return lambda_c * torch.log1p(eta.pow(beta) * rho.pow(gamma) * e_dot.pow(delta))
+
+
+def _log_space_bonus(
+    eta: Tensor,
+    rho: Tensor,
+    e_dot: Tensor,
+    beta: float,
+    gamma: float,
+    delta: float,
+    lambda_c: float,
+) -> Tensor:
+    """``_hcse_bonus`` as ``softplus(β log η + γ log ρ + δ log Ė)`` in fp32.
+
+    The fractional powers never overflow or underflow: the exponents are
+    combined as a sum of logs and ``softplus`` evaluates ``log1p(exp(s))``
+    stably for any ``s``.
+    """
+    tiny = torch.finfo(torch.float32).tiny
+    terms = [
+        exponent * value.float().clamp(min=tiny).log()
+        for exponent, value in ((beta, eta), (gamma, rho), (delta, e_dot))
+    ]
+    return lambda_c * nn.functional.softplus(terms[0] + terms[1] + terms[2])
+
+
 # Utility functions are imported at bottom to avoid circular imports
-from .utils import corrcoef, info_nce_loss
+from .distributed import (
+    distributed_connectivity_density,
+    distributed_energy,
+    distributed_info_nce_loss,
+    is_distributed,
+)
+from .instrumentation import PhaseTimer, hcse_phase
+from .utils import (
+    compiled_fused_statistics,
+    connectivity_density,
+    fused_statistics,
+    info_nce_loss,
+    sketch_connectivity_density,
+    stable_connectivity_density,
+    stable_statistics,
+    subsample_rows,
+)
 
 __all__ = ["HCSEMixin"]
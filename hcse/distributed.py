@@ -0,0 +1,103 @@
+"""Distributed-aware HCSE surrogates.
+
+Under data parallelism each rank only sees its shard of the batch. These
+functions let the surrogates reflect the global batch: InfoNCE features are
+all-gathered with gradient support so every rank scores its rows against
+the global negatives, and correlation and energy are computed from
+all-reduced sufficient statistics instead of gathered activations.
+"""
+
+from __future__ import annotations
+
+from typing import Tuple
+
+import torch
+import torch.distributed as dist
+from torch import Tensor, nn
+
+if dist.is_available():
+    # autograd-aware collectives; only importable on builds with distributed
+    import torch.distributed.nn.functional as dist_nn
+
+
+def is_distributed() -> bool:
+    """Whether a process group with more than one rank is active."""
+    return dist.is_available() and dist.is_initialized() and dist.get_world_size() > 1
+
+
+def _global_count(rows: int, device: torch.device) -> Tensor:
+    count = torch.tensor(float(rows), device=device)
+    dist.all_reduce(count)
+    return count
+
+
+def all_gather_rows(matrix: Tensor) -> Tuple[Tensor, int]:
+    """Gather the rows (dim -2) of ``matrix`` from every rank.
+
+    Ranks may hold different row counts. Gradients flow back to each rank's
+    own rows.
+
+    Returns
+    -------
+    tuple
+        ``(gathered, offset)`` where ``offset`` is the position of this
+        rank's first row in ``gathered``.
+    """
+    world = dist.get_world_size()
+    count = torch.tensor([matrix.shape[-2]], device=matrix.device)
+    counts = [torch.zeros_like(count) for _ in range(world)]
+    dist.all_gather(counts, count)
+    sizes = [int(c) for c in counts]
+    pad = max(sizes) - matrix.shape[-2]
+    padded = nn.functional.pad(matrix, (0, 0, 0, pad)) if pad else matrix
+    parts = dist_nn.all_gather(padded)
+    gathered = torch.cat([part[..., :size, :] for part, size in zip(parts, sizes)], dim=-2)
+    return gathered, sum(sizes[: dist.get_rank()])
+
+
+def distributed_info_nce_loss(features: Tensor, temperature: float = 0.1) -> Tensor:
+    """InfoNCE of the global batch, scoring this rank's rows against all ranks.
+
+    The per-row terms are summed, all-reduced and divided by the global row
+    count, so every rank holds :func:`hcse.utils.info_nce_loss` of the
+    concatenated batch, as ρ and Ė are, even when the ranks hold different
+    row counts, e.g. after padding is masked out or tokens are subsampled.
+    """
+    features = nn.functional.normalize(features, dim=-1)
+    everything, offset = all_gather_rows(features)
+    logits = features @ everything.transpose(-2, -1) / temperature
+    positives = torch.diagonal(logits, offset=offset, dim1=-2, dim2=-1)
+    terms = (torch.logsumexp(logits, dim=-1) - positives).sum(dim=-1)
+    return dist_nn.all_reduce(terms) / everything.shape[-2]
+
+
+def distributed_connectivity_density(matrix: Tensor) -> Tensor:
+    """Global mean absolute off-diagonal correlation from all-reduced statistics.
+
+    Only column sums and the ``n x n`` centred cross-products are
+    communicated; the raw activations never leave the rank.
+    """
+    count = _global_count(matrix.shape[-2], matrix.device)
+    mean = dist_nn.all_reduce(matrix.sum(dim=-2)) / count
+    centered = matrix - mean.unsqueeze(-2)
+    cov = dist_nn.all_reduce(centered.transpose(-2, -1) @ centered) / (count - 1)
+    std = torch.diagonal(cov, dim1=-2, dim2=-1).clamp(min=1e-24).sqrt()
+    corr = cov / (std.unsqueeze(-1) * std.unsqueeze(-2))
+    off_diag = corr - torch.diag_embed(torch.diagonal(corr, dim1=-2, dim2=-1))
+    return off_diag.abs().mean(dim=(-2, -1))
+
+
+def distributed_energy(matrix: Tensor) -> Tensor:
+    """Global mean squared activation."""
+    count = _global_count(matrix.shape[-2], matrix.device)
+    total = dist_nn.all_reduce(matrix.pow(2).sum(dim=(-2, -1)))
+    return total / (count * matrix.shape[-1])
+
+
+__all__ = [
+    "is_distributed",
+    "all_gather_rows",
+    "distributed_info_nce_loss",
+    "distributed_connectivity_density",
+    "distributed_energy",
+]
@@ -0,0 +1,77 @@
+"""Per-phase timing of the HCSE surrogates.
+
+A :class:`PhaseTimer` is only created when ``hcse_params`` asks for it
+(``instrument`` or ``profile``). Without one, :func:`hcse_phase` returns a
+shared no-op context, so the uninstrumented path pays a single ``None``
+check per phase.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, ContextManager, Dict, Iterator, Optional
+
+import torch
+from torch.profiler import record_function
+
+_NO_PHASE: ContextManager[None] = nullcontext()
+
+
+class PhaseTimer:
+    """Collect wall-clock time and peak memory for each HCSE phase.
+
+    On CUDA the device is synchronised around every phase so the times
+    cover the kernels rather than their launch, and the peak allocated
+    memory is read after resetting the peak counter. Peak memory is not
+    tracked on other devices. With ``profile`` each phase is also wrapped
+    in ``torch.profiler.record_function("hcse/<phase>")``.
+    """
+
+    def __init__(self, device: Optional[torch.device] = None, profile: bool = False) -> None:
+        self.device = device
+        self.profile = profile
+        self.seconds: Dict[str, float] = {}
+        self.peak_bytes: Dict[str, int] = {}
+
+    @classmethod
+    def from_params(
+        cls, hcse_params: Dict[str, Any], device: Optional[torch.device] = None
+    ) -> Optional["PhaseTimer"]:
+        """A timer if ``instrument`` or ``profile`` is set, else ``None``."""
+        if not (hcse_params.get("instrument") or hcse_params.get("profile")):
+            return None
+        return cls(device, profile=bool(hcse_params.get("profile")))
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        cuda = self.device is not None and self.device.type == "cuda"
+        annotation = record_function(f"hcse/{name}") if self.profile else _NO_PHASE
+        with annotation:
+            if cuda:
+                torch.cuda.synchronize(self.device)
+                torch.cuda.reset_peak_memory_stats(self.device)
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                if cuda:
+                    torch.cuda.synchronize(self.device)
+                    peak = torch.cuda.max_memory_allocated(self.device)
+                    self.peak_bytes[name] = max(self.peak_bytes.get(name, 0), peak)
+                self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - start
+
+    def metrics(self) -> Dict[str, float]:
+        """Flat ``hcse/<phase>_ms`` and ``hcse/<phase>_peak_mb`` values."""
+        metrics = {f"hcse/{name}_ms": 1000.0 * value for name, value in self.seconds.items()}
+        for name, value in self.peak_bytes.items():
+            metrics[f"hcse/{name}_peak_mb"] = value / 2**20
+        return metrics
+
+
+def hcse_phase(timer: Optional[PhaseTimer], name: str) -> ContextManager[None]:
+    """``timer.phase(name)``, or a no-op context when ``timer`` is ``None``."""
+    return timer.phase(name) if timer is not None else _NO_PHASE
+
+
+__all__ = ["PhaseTimer", "hcse_phase"]
@@ -2,17 +2,123 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
 
+from torch import Tensor, nn
 from transformers import Trainer
 
 
+_HCSE_OUTPUTS = ("hcse_surrogates", "hcse_timings")
+
+
+@contextmanager
+def _forward_with_hcse(module: nn.Module, hcse_params: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Route calls of ``module`` to ``forward_with_hcse`` while active.
+
+    A wrapper such as DDP calls ``module(...)``, so shadowing ``forward`` on
+    the instance lets the HCSE forward run inside the wrapper's own forward
+    (and its gradient-reducer bookkeeping). An instance-level ``forward``
+    already set by e.g. accelerate is restored afterwards.
+
+    The wrapper may rebuild the output object, which drops the extra HCSE
+    attributes, so they are also collected in the yielded dict.
+    """
+    previous = module.__dict__.get("forward")
+    captured: Dict[str, Any] = {}
+
+    def forward(*args: Any, **kwargs: Any) -> Any:
+        outputs = module.forward_with_hcse(*args, hcse_params=hcse_params, **kwargs)  # type: ignore[operator]
+        captured.update(
+            (name, getattr(outputs, name)) for name in _HCSE_OUTPUTS if hasattr(outputs, name)
+        )
+        return outputs
+
+    module.forward = forward  # type: ignore[method-assign]
+    try:
+        yield captured
+    finally:
+        if previous is None:
+            del module.forward
+        else:
+            module.forward = previous  # type: ignore[method-assign]
+
+
 class HfTrainerWithHCSE(Trainer):
-    """Trainer that integrates HCSE into the loss computation."""
+    """Trainer that integrates HCSE into the loss computation.
+
+    Besides the model-level options, ``hcse_params`` controls how often the
+    surrogates are computed during training. With ``interval`` k > 1 the
+    full surrogates run only on every k-th optimisation step after the first
+    ``warmup_steps`` steps (which all compute them). The other steps run a
+    plain forward pass and subtract a bonus rebuilt from an exponential
+    moving average (``ema_decay``) of η, ρ and Ė. That bonus is a constant,
+    so it keeps the reported loss comparable but carries no gradient.
+
+    The surrogates of every training step that computes them are averaged
+    and added to the next training ``log()`` call as ``hcse/eta``,
+    ``hcse/rho`` and ``hcse/e_dot`` (one key per layer with a suffix for
+    stacked layers), so every reporting callback receives them. With
+    ``instrument`` the per-phase timings from
+    :meth:`~hcse.core.HCSEMixin.forward_with_hcse` are averaged the same way.
+
+    Under DDP/FSDP the Trainer passes the wrapped model. The forward still
+    goes through the wrapper, while the HCSE helpers are taken from
+    ``accelerator.unwrap_model``.
+    """
 
     def __init__(self, *args: Any, hcse_params: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
         self.hcse_params = hcse_params or {}
+        self.hcse_ema: Optional[Tuple[Tensor, Tensor, Tensor]] = None
+        self._hcse_totals: Dict[str, Any] = {}
+        self._hcse_counts: Dict[str, int] = {}
+
+    def hcse_due(self, model: Any) -> bool:
+        """Whether the full surrogates should be computed for this step."""
+        interval = self.hcse_params.get("interval", 1)
+        warmup = self.hcse_params.get("warmup_steps", 0)
+        step = self.state.global_step
+        if interval <= 1 or not model.training or self.hcse_ema is None or step < warmup:
+            return True
+        return (step - warmup) % interval == 0
+
+    def update_hcse_ema(self, surrogates: Tuple[Tensor, Tensor, Tensor]) -> None:
+        decay = self.hcse_params.get("ema_decay", 0.9)
+        if self.hcse_ema is None:
+            self.hcse_ema = surrogates
+        else:
+            self.hcse_ema = tuple(  # type: ignore[assignment]
+                decay * old + (1.0 - decay) * new for old, new in zip(self.hcse_ema, surrogates)
+            )
+
+    def record_hcse_metrics(self, outputs: Any) -> None:
+        """Accumulate the surrogates and timings of one step for logging."""
+        values: Dict[str, Any] = dict(getattr(outputs, "hcse_timings", None) or {})
+        for name, value in zip(("eta", "rho", "e_dot"), outputs.hcse_surrogates):
+            if value.dim() == 0:
+                values[f"hcse/{name}"] = value
+            else:
+                for index, item in enumerate(value):
+                    values[f"hcse/{name}_{index}"] = item
+        for key, value in values.items():
+            # tensors stay on device until log() to avoid a sync per step
+            self._hcse_totals[key] = self._hcse_totals.get(key, 0.0) + value
+            self._hcse_counts[key] = self._hcse_counts.get(key, 0) + 1
+
+    def pop_hcse_metrics(self) -> Dict[str, float]:
+        """Mean of the accumulated HCSE metrics since the last call."""
+        metrics = {
+            key: float(total) / self._hcse_counts[key] for key, total in self._hcse_totals.items()
+        }
+        self._hcse_totals.clear()
+        self._hcse_counts.clear()
+        return metrics
+
+    def log(self, logs: Dict[str, float], *args: Any, **kwargs: Any) -> None:
+        if "loss" in logs and self._hcse_totals:
+            logs.update(self.pop_hcse_metrics())
+        super().log(logs, *args, **kwargs)
 
     def compute_loss(
         self,
@@ -21,7 +127,20 @@ class HfTrainerWithHCSE(Trainer):
         return_outputs: bool = False,
         **kwargs: Any,
     ):
-        outputs = model.forward_with_hcse(**inputs, hcse_params=self.hcse_params)
+        unwrapped = self.accelerator.unwrap_model(model)
+        if self.hcse_due(model):
+            with _forward_with_hcse(unwrapped, self.hcse_params) as captured:
+                outputs = model(**inputs)
+            for name, value in captured.items():
+                setattr(outputs, name, value)
+            if model.training:
+                self.update_hcse_ema(outputs.hcse_surrogates)
+                self.record_hcse_metrics(outputs)
+        else:
+            outputs = model(**inputs)
+            assert self.hcse_ema is not None
+            bonus = unwrapped.hcse_bonus_from_surrogates(*self.hcse_ema, self.hcse_params)
+            setattr(outputs, "loss", unwrapped.compute_loss(outputs.loss, bonus))
         loss = outputs.loss
         return (loss, outputs) if return_outputs else loss
 
@@ -1,7 +1,9 @@
 import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
 import torch
 from hcse.core import HCSEMixin
-from hcse.utils import corrcoef, info_nce_loss
+import hcse.utils
+from hcse.utils import connectivity_density, corrcoef, fused_statistics, info_nce_loss, subsample_rows
 
 
 class BaseModel(torch.nn.Module):
@@ -51,3 +53,211 @@ def test_info_nce_loss_identity():
     feats = torch.eye(3)
     loss = info_nce_loss(feats)
     assert loss < 1e-2
+
+
+def test_blocked_connectivity_density_matches_full():
+    x = torch.randn(12, 10, requires_grad=True)
+    full = connectivity_density(x)
+    (grad_full,) = torch.autograd.grad(full, x)
+    blocked = connectivity_density(x, block_size=3)
+    (grad_blocked,) = torch.autograd.grad(blocked, x)
+    assert torch.allclose(blocked, full, atol=1e-6)
+    assert torch.allclose(grad_blocked, grad_full, atol=1e-6)
+
+
+def test_surrogates_rho_block_size():
+    model = DummyModel(8)
+    data = torch.randn(2, 5, 8)
+    _, rho, _ = model.compute_hcse_surrogates(data)
+    _, rho_blocked, _ = model.compute_hcse_surrogates(data, {"rho_block_size": 3})
+    assert torch.allclose(rho, rho_blocked, atol=1e-6)
+
+
+def test_blocked_info_nce_matches_full():
+    x = torch.randn(11, 6, requires_grad=True)
+    full = info_nce_loss(x)
+    (grad_full,) = torch.autograd.grad(full, x)
+    blocked = info_nce_loss(x, block_size=4)
+    (grad_blocked,) = torch.autograd.grad(blocked, x)
+    assert torch.allclose(blocked, full, atol=1e-5)
+    assert torch.allclose(grad_blocked, grad_full, atol=1e-5)
+
+
+def test_subsample_rows_deterministic():
+    x = torch.arange(20.0).reshape(10, 2)
+    picked = subsample_rows(x, 4)
+    assert picked.shape == (4, 2)
+    assert torch.equal(picked, subsample_rows(x, 4))
+    assert torch.equal(picked[0], x[0]) and torch.equal(picked[-1], x[-1])
+    assert subsample_rows(x, None) is x
+
+
+def test_hook_capture_matches_hidden_states():
+    torch.manual_seed(0)
+    model = DummyModel(4)
+    input_ids = torch.randn(2, 3, 4)
+    expected = model.forward_with_hcse(input_ids, hcse_params={"layer": 0}).loss
+    hooked = model.forward_with_hcse(input_ids, hcse_params={"layer": "linear", "capture": "hook"}).loss
+    assert torch.allclose(hooked, expected)
+    assert not model.linear._forward_hooks
+
+
+def test_hcse_layer_module_indexes_blocks():
+    model = DummyModel(4)
+    model.blocks = torch.nn.ModuleList([torch.nn.Identity(), torch.nn.ReLU()])
+    assert model.hcse_layer_module(1) is model.blocks[0]
+    for layer in (0, 2, -1):
+        with pytest.raises(ValueError):
+            model.hcse_layer_module(layer)
+    assert model.hcse_layer_module("blocks.1") is model.blocks[1]
+
+
+def test_stacked_surrogates_match_per_layer():
+    model = DummyModel(4)
+    stack = torch.randn(3, 2, 5, 4)
+    etas, rhos, e_dots = model.compute_hcse_surrogates(stack)
+    assert etas.shape == rhos.shape == e_dots.shape == (3,)
+    for i in range(3):
+        eta, rho, e_dot = model.compute_hcse_surrogates(stack[i])
+        assert torch.allclose(etas[i], eta, atol=1e-5)
+        assert torch.allclose(rhos[i], rho, atol=1e-6)
+        assert torch.allclose(e_dots[i], e_dot)
+
+
+def test_multi_layer_bonus_weights():
+    model = DummyModel(4)
+    input_ids = torch.randn(2, 3, 4)
+    single = model.forward_with_hcse(input_ids, hcse_params={"layer": 0}).loss
+    multi = model.forward_with_hcse(
+        input_ids, hcse_params={"layer": [0, 0], "layer_weights": [0.25, 0.75]}
+    ).loss
+    hooked = model.forward_with_hcse(
+        input_ids, hcse_params={"layer": ["linear", "linear"], "capture": "hook"}
+    ).loss
+    assert torch.allclose(multi, single, atol=1e-5)
+    assert torch.allclose(hooked, single, atol=1e-5)
+
+
+def test_attention_mask_skips_padding():
+    model = DummyModel(4)
+    data = torch.randn(2, 5, 4)
+    mask = torch.tensor([[1, 1, 1, 0, 0], [1, 1, 1, 1, 0]])
+    packed = torch.cat([data[0, :3], data[1, :4]])
+    expected = model.compute_hcse_surrogates(packed)
+    masked = model.compute_hcse_surrogates(data, attention_mask=mask)
+    stacked = model.compute_hcse_surrogates(torch.stack([data, data]), attention_mask=mask)
+    for value, ref, batched in zip(masked, expected, stacked):
+        assert torch.allclose(value, ref)
+        assert torch.allclose(batched, ref.expand(2), atol=1e-6)
+
+
+def test_fused_statistics_matches_reference():
+    x = torch.randn(2, 12, 6, dtype=torch.float64, requires_grad=True)
+    rho, e_dot = fused_statistics(x)
+    ref_rho = connectivity_density(x)
+    ref_e_dot = x.pow(2).mean(dim=(-2, -1))
+    assert torch.allclose(rho, ref_rho) and torch.allclose(e_dot, ref_e_dot)
+    grad = torch.autograd.grad((rho + e_dot).sum(), x)[0]
+    ref_grad = torch.autograd.grad((ref_rho + ref_e_dot).sum(), x)[0]
+    assert torch.allclose(grad, ref_grad)
+
+
+def test_compiled_fused_statistics_falls_back(monkeypatch):
+    def broken(fn, **kwargs):
+        def run(*args):
+            raise RuntimeError("no compiler")
+        return run
+
+    monkeypatch.setattr(torch, "compile", broken)
+    monkeypatch.setattr(hcse.utils, "_COMPILED", {})
+    model = DummyModel(4)
+    data = torch.randn(2, 3, 4)
+    expected = model.compute_hcse_surrogates(data)
+    with pytest.warns(UserWarning, match="torch.compile failed"):
+        result = model.compute_hcse_surrogates(data, {"fused": True, "compile": True})
+    for value, ref in zip(result, expected):
+        assert torch.allclose(value, ref, atol=1e-6)
+
+
+def test_mixed_precision_surrogates_track_fp32():
+    torch.manual_seed(0)
+    model = DummyModel(8)
+    data = torch.randn(2, 16, 8) * 3 + 1
+    params = {"precision": "mixed"}
+    reference = model.compute_hcse_surrogates(data)
+    model_bf16 = DummyModel(8).to(torch.bfloat16)
+    model_bf16.info_nce_head.weight.data = model.info_nce_head.weight.data.to(torch.bfloat16)
+    mixed = model_bf16.compute_hcse_surrogates(data.to(torch.bfloat16), params)
+    for value, ref in zip(mixed, reference):
+        assert value.dtype == torch.float32
+        assert torch.allclose(value, ref, rtol=5e-2)
+    bonus = model.hcse_bonus_from_surrogates(*reference, {"beta": 1.2, "delta": 0.8})
+    log_bonus = model.hcse_bonus_from_surrogates(*reference, {"beta": 1.2, "delta": 0.8, **params})
+    assert torch.allclose(bonus, log_bonus)
+
+
+def test_mixed_precision_survives_fp16_overflow():
+    data = (torch.randn(64, 8) * 2000).to(torch.float16)
+    naive = connectivity_density(data)
+    rho, e_dot = hcse.utils.stable_statistics(data)
+    assert not torch.isfinite(naive) or not torch.isfinite(data.pow(2).mean())
+    assert torch.isfinite(rho) and torch.isfinite(e_dot)
+    ref_rho, ref_e_dot = fused_statistics(data.double())
+    assert torch.allclose(rho.double(), ref_rho, rtol=1e-2)
+    assert torch.allclose(e_dot.double(), ref_e_dot, rtol=1e-2)
+
+
+def test_sketch_connectivity_density_close_to_exact():
+    torch.manual_seed(0)
+    x = torch.randn(512, 16) @ torch.randn(16, 256) + 0.5 * torch.randn(512, 256)
+    exact = connectivity_density(x)
+    gen = torch.Generator().manual_seed(0)
+    estimates = torch.stack([hcse.utils.sketch_connectivity_density(x, 64, gen) for _ in range(8)])
+    assert ((estimates - exact).abs() / exact).max() < 0.05
+    assert torch.allclose(hcse.utils.sketch_connectivity_density(x, 256), exact)
+
+
+def test_sketch_surrogates_reproducible():
+    data = torch.randn(4, 8, 32)
+    params = {"rho_sketch_size": 8, "rho_sketch_seed": 3}
+    first = [DummyModel(32).compute_hcse_surrogates(data, params)[1] for _ in range(2)]
+    model = DummyModel(32)
+    again = [model.compute_hcse_surrogates(data, params)[1] for _ in range(2)]
+    assert torch.equal(first[0], first[1]) and torch.equal(first[0], again[0])
+    assert not torch.equal(again[0], again[1])
+
+
+def test_mixed_precision_honours_block_and_sketch():
+    torch.manual_seed(0)
+    data = (torch.randn(4, 8, 32) * 2000).to(torch.float16)
+    model = DummyModel(32).to(torch.float16)
+    mixed = {"precision": "mixed"}
+    _, rho, e_dot = model.compute_hcse_surrogates(data, mixed)
+    _, tiled, tiled_e_dot = model.compute_hcse_surrogates(data, {**mixed, "rho_block_size": 5})
+    assert torch.allclose(tiled, rho) and torch.equal(tiled_e_dot, e_dot)
+    sketch = {**mixed, "rho_sketch_size": 8, "rho_sketch_seed": 1}
+    _, sketched, sketch_e_dot = model.compute_hcse_surrogates(data, sketch)
+    gen = torch.Generator().manual_seed(1)
+    expected = hcse.utils.sketch_connectivity_density(data.reshape(32, 32).double(), 8, gen)
+    assert sketched.dtype == torch.float32 and torch.isfinite(sketch_e_dot)
+    assert torch.allclose(sketched.double(), expected, rtol=1e-2)
+    assert torch.allclose(sketch_e_dot, e_dot, rtol=1e-3)
+    with pytest.raises(ValueError):
+        model.compute_hcse_surrogates(data, {**mixed, "fused": True})
+
+
+def test_compute_hcse_bonus_uses_mixed_precision_bonus():
+    model = DummyModel(8)
+    data = torch.randn(2, 4, 8)
+    params = {"precision": "mixed"}
+    surrogates = model.compute_hcse_surrogates(data, params)
+    expected = model.hcse_bonus_from_surrogates(*surrogates, {"beta": 1.2, "gamma": 1.0, "delta": 0.8, "lambda_c": 0.5, **params})
+    assert torch.equal(model.compute_hcse_bonus(data, 1.2, 1.0, 0.8, 0.5, params), expected)
+
+
+def test_fused_rejects_block_and_sketch_options():
+    model = DummyModel(8)
+    data = torch.randn(2, 4, 8)
+    for option in ({"rho_block_size": 2}, {"rho_sketch_size": 4}):
+        with pytest.raises(ValueError):
+            model.compute_hcse_surrogates(data, {"fused": True, **option})
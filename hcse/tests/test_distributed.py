@@ -0,0 +1,198 @@
+import sys, os; sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import socket
+import tempfile
+
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+from transformers.modeling_outputs import CausalLMOutput
+
+from hcse.core import HCSEMixin, _hcse_bonus
+from hcse.distributed import (
+    distributed_connectivity_density,
+    distributed_energy,
+    distributed_info_nce_loss,
+)
+from hcse.utils import connectivity_density, info_nce_loss
+
+WORLD = 2
+# beta, gamma, delta, lambda_c
+BONUS = (1.5, 1.0, 0.5, 1.0)
+
+
+class BaseModel(torch.nn.Module):
+    def __init__(self, hidden_size: int) -> None:
+        super().__init__()
+
+
+class SurrogateModel(HCSEMixin, BaseModel):
+    def __init__(self, hidden_size: int) -> None:
+        torch.manual_seed(1)
+        HCSEMixin.__init__(self, hidden_size=hidden_size)
+        self.double()
+
+
+def _shards():
+    torch.manual_seed(0)
+    data = torch.randn(9, 6, dtype=torch.float64)
+    return data, [data[:4], data[4:]]
+
+
+def _worker(rank, init_file, results):
+    dist.init_process_group("gloo", init_method=f"file://{init_file}", rank=rank, world_size=WORLD)
+    try:
+        data, shards = _shards()
+        local = shards[rank].clone().requires_grad_(True)
+        eta = distributed_info_nce_loss(local)
+        rho = distributed_connectivity_density(local)
+        e_dot = distributed_energy(local)
+        (eta + rho + e_dot).backward()
+        results.put((rank, eta.item(), rho.item(), e_dot.item(), local.grad))
+    finally:
+        dist.destroy_process_group()
+
+
+def test_global_surrogates_match_full_batch():
+    data, shards = _shards()
+    full = data.clone().requires_grad_(True)
+    eta = info_nce_loss(full)
+    rho = connectivity_density(full)
+    e_dot = full.pow(2).mean()
+    # backward sums over ranks: every rank contributes its loss
+    (WORLD * (eta + rho + e_dot)).backward()
+
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    with tempfile.TemporaryDirectory() as tmp:
+        init_file = os.path.join(tmp, "init")
+        procs = [ctx.Process(target=_worker, args=(rank, init_file, results)) for rank in range(WORLD)]
+        for proc in procs:
+            proc.start()
+        outputs = [results.get(timeout=120) for _ in procs]
+        for proc in procs:
+            proc.join(timeout=120)
+            assert proc.exitcode == 0
+
+    for rank, global_eta, dist_rho, dist_e_dot, grad in outputs:
+        assert abs(global_eta - eta.item()) < 1e-9
+        assert abs(dist_rho - rho.item()) < 1e-9
+        assert abs(dist_e_dot - e_dot.item()) < 1e-9
+        rows = slice(0, 4) if rank == 0 else slice(4, None)
+        assert torch.allclose(grad, full.grad[rows])
+
+
+def _surrogate_worker(rank, init_file, results):
+    dist.init_process_group("gloo", init_method=f"file://{init_file}", rank=rank, world_size=WORLD)
+    try:
+        _, shards = _shards()
+        model = SurrogateModel(shards[rank].shape[-1])
+        local = shards[rank].clone().requires_grad_(True)
+        eta, rho, e_dot = model.compute_hcse_surrogates(local, {"distributed": True})
+        bonus = _hcse_bonus(eta, rho, e_dot, *BONUS)
+        bonus.backward()
+        results.put((rank, eta.item(), rho.item(), e_dot.item(), bonus.item(), local.grad))
+    finally:
+        dist.destroy_process_group()
+
+
+def test_compute_hcse_surrogates_uneven_shards():
+    data, _ = _shards()
+    full = data.clone().requires_grad_(True)
+    eta, rho, e_dot = SurrogateModel(data.shape[-1]).compute_hcse_surrogates(full)
+    bonus = _hcse_bonus(eta, rho, e_dot, *BONUS)
+    (WORLD * bonus).backward()
+
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    with tempfile.TemporaryDirectory() as tmp:
+        init_file = os.path.join(tmp, "init")
+        procs = [ctx.Process(target=_surrogate_worker, args=(rank, init_file, results)) for rank in range(WORLD)]
+        for proc in procs:
+            proc.start()
+        outputs = [results.get(timeout=120) for _ in procs]
+        for proc in procs:
+            proc.join(timeout=120)
+            assert proc.exitcode == 0
+
+    for rank, dist_eta, dist_rho, dist_e_dot, dist_bonus, grad in outputs:
+        # every rank optimises the bonus of the global batch
+        assert abs(dist_eta - eta.item()) < 1e-9
+        assert abs(dist_rho - rho.item()) < 1e-9
+        assert abs(dist_e_dot - e_dot.item()) < 1e-9
+        assert abs(dist_bonus - bonus.item()) < 1e-9
+        rows = slice(0, 4) if rank == 0 else slice(4, None)
+        assert torch.allclose(grad, full.grad[rows])
+
+
+class LinearModel(torch.nn.Module):
+    def __init__(self, hidden_size: int) -> None:
+        super().__init__()
+        self.linear = torch.nn.Linear(hidden_size, hidden_size)
+
+    def forward(self, input_ids, labels, output_hidden_states=False):
+        hidden = self.linear(input_ids)
+        # a real output class, so DDP can find the tensors it returns
+        return CausalLMOutput(loss=torch.nn.functional.mse_loss(hidden, labels), hidden_states=(hidden,))
+
+
+class TrainerModel(HCSEMixin, LinearModel):
+    def __init__(self, hidden_size: int) -> None:
+        torch.manual_seed(1)
+        HCSEMixin.__init__(self, hidden_size=hidden_size)
+
+
+class ShardDataset(torch.utils.data.Dataset):
+    def __len__(self) -> int:
+        return 8
+
+    def __getitem__(self, idx: int):
+        x = torch.randn(6, generator=torch.Generator().manual_seed(idx))
+        return {"input_ids": x, "labels": x.flip(0)}
+
+
+def _trainer_worker(rank, port, tmp, results):
+    from transformers import TrainingArguments
+
+    from hcse.pipeline import HfTrainerWithHCSE
+
+    os.environ.update(
+        MASTER_ADDR="127.0.0.1", MASTER_PORT=str(port), RANK=str(rank), LOCAL_RANK=str(rank), WORLD_SIZE=str(WORLD)
+    )
+    args = TrainingArguments(
+        output_dir=tmp,
+        per_device_train_batch_size=2,
+        num_train_epochs=1,
+        logging_steps=1,
+        report_to=[],
+        use_cpu=True,
+        ddp_backend="gloo",
+    )
+    model = TrainerModel(6)
+    params = {"layer": 0, "distributed": True, "interval": 2}
+    trainer = HfTrainerWithHCSE(model=model, args=args, train_dataset=ShardDataset(), hcse_params=params)
+    trainer.train()
+    weights = torch.cat([p.detach().flatten() for p in model.parameters()])
+    etas = [entry["hcse/eta"] for entry in trainer.state.log_history if "hcse/eta" in entry]
+    results.put((rank, weights, etas))
+    dist.destroy_process_group()
+
+
+def test_trainer_under_ddp():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    with tempfile.TemporaryDirectory() as tmp:
+        procs = [ctx.Process(target=_trainer_worker, args=(rank, port, tmp, results)) for rank in range(WORLD)]
+        for proc in procs:
+            proc.start()
+        outputs = sorted(results.get(timeout=300) for _ in procs)
+        for proc in procs:
+            proc.join(timeout=120)
+            assert proc.exitcode == 0
+
+    (_, weights, etas), (_, other_weights, other_etas) = outputs
+    # DDP kept the replicas in sync and every rank saw the global eta
+    assert torch.allclose(weights, other_weights)
+    assert etas and etas == other_etas
@@ -78,3 +78,62 @@ def test_compute_loss_uses_bonus():
 
     assert torch.allclose(trainer_loss, expected_loss)
     assert trainer_loss < baseline_loss
+
+
+def test_interval_reuses_ema_bonus(monkeypatch):
+    model = DummyModel(4)
+    args = TrainingArguments(output_dir="/tmp/hcse-tests", per_device_train_batch_size=1)
+    params = {"layer": 0, "interval": 3, "warmup_steps": 1, "ema_decay": 0.5}
+    trainer = HfTrainerWithHCSE(model=model, args=args, train_dataset=DummyDataset(), hcse_params=params)
+    calls = []
+    original = model.compute_hcse_surrogates
+    monkeypatch.setattr(
+        model, "compute_hcse_surrogates", lambda *a, **k: calls.append(1) or original(*a, **k)
+    )
+    inputs = {"input_ids": torch.randn(3, 4), "labels": torch.randn(3, 4)}
+    model.train()
+    for step in range(7):
+        trainer.state.global_step = step
+        loss = trainer.compute_loss(model, inputs)
+    # steps 0 (warmup), 1 and 4 compute; the others reuse the EMA
+    assert len(calls) == 3
+    baseline = model.forward(**inputs).loss
+    bonus = model.hcse_bonus_from_surrogates(*trainer.hcse_ema, params)
+    assert torch.allclose(loss, baseline - bonus)
+
+
+def test_instrumented_forward_reports_phase_timings():
+    model = DummyModel(4)
+    inputs = {"input_ids": torch.randn(2, 4), "labels": torch.randn(2, 4)}
+    plain = model.forward_with_hcse(**inputs, hcse_params={"layer": 0})
+    assert not hasattr(plain, "hcse_timings")
+    outputs = model.forward_with_hcse(**inputs, hcse_params={"layer": 0, "instrument": True, "profile": True})
+    assert set(outputs.hcse_timings) == {
+        "hcse/projection_ms",
+        "hcse/infonce_ms",
+        "hcse/corrcoef_ms",
+        "hcse/bonus_ms",
+    }
+    assert all(value >= 0 for value in outputs.hcse_timings.values())
+
+
+def test_trainer_logs_hcse_metrics():
+    model = DummyModel(4)
+    args = TrainingArguments(
+        output_dir="/tmp/hcse-tests",
+        per_device_train_batch_size=1,
+        num_train_epochs=1,
+        logging_steps=1,
+        report_to=[],
+    )
+    trainer = HfTrainerWithHCSE(
+        model=model,
+        args=args,
+        train_dataset=DummyDataset(),
+        hcse_params={"layer": 0, "instrument": True},
+    )
+    trainer.train()
+    logged = [entry for entry in trainer.state.log_history if "loss" in entry]
+    assert logged
+    for entry in logged:
+        assert {"hcse/eta", "hcse/rho", "hcse/e_dot", "hcse/infonce_ms"} <= set(entry)
@@ -1,5 +1,19 @@
-"""Holland Dual physics and cognition stack."""
+"""Holland Dual physics and cognition stack.
+
+Subpackages are imported on first attribute access, so ``import
+holland_dual`` stays cheap and only ``cognition`` and ``fusion`` pull in
+torch.
+"""
 
 from __future__ import annotations
 
+import importlib
+from types import ModuleType
+
 __all__ = ["quantum", "cognition", "fusion"]
+
+
+def __getattr__(name: str) -> ModuleType:
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
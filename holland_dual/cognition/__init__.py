@@ -1,8 +1,26 @@
-"""Cognition subpackage exposing HCSE components."""
+"""Cognition subpackage exposing HCSE components.
+
+The HCSE classes are imported on first access since they load torch and
+transformers.
+"""
 
 from __future__ import annotations
 
-from hcse.core import HCSEMixin
-from hcse.pipeline import HfTrainerWithHCSE
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from hcse.core import HCSEMixin
+    from hcse.pipeline import HfTrainerWithHCSE
+
+_EXPORTS = {"HCSEMixin": "hcse.core", "HfTrainerWithHCSE": "hcse.pipeline"}
 
 __all__ = ["HCSEMixin", "HfTrainerWithHCSE"]
+
+
+def __getattr__(name: str) -> Any:
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
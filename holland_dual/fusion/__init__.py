@@ -1,7 +1,30 @@
-"""Fusion utilities bridging quantum and cognition stacks."""
+"""Fusion utilities bridging quantum and cognition stacks.
+
+The adapter and the streaming dataset are imported on first access since
+they load torch.
+"""
 
 from __future__ import annotations
 
-from .adapter import simulation_to_activation
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .adapter import simulation_to_activation
+    from .dataset import SimulationActivationDataset, simulation_loader
+
+_EXPORTS = {
+    "simulation_to_activation": ".adapter",
+    "SimulationActivationDataset": ".dataset",
+    "simulation_loader": ".dataset",
+}
+
+__all__ = ["simulation_to_activation", "SimulationActivationDataset", "simulation_loader"]
+
 
-__all__ = ["simulation_to_activation"]
+def __getattr__(name: str) -> Any:
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,19 +1,38 @@
 from __future__ import annotations
 
+from typing import Optional
+
 import numpy as np
 import torch
 
+from holland_dual.quantum.huqce.cache import ResultCache
 from holland_dual.quantum.huqce.simulation import HuqceParams, HuqceSimulator
-from hcse.core import HCSEMixin
 
 
-def simulation_to_activation(params: HuqceParams) -> torch.Tensor:
-    """Run HUQCE simulation and convert final wavefunction to activation tensor."""
-    sim = HuqceSimulator(params)
-    psi = sim.run()
-    # Map complex wavefunction to real-valued activations: concatenate real/imag
-    activations = np.stack([psi.real, psi.imag], axis=-1)
-    return torch.from_numpy(activations.astype(np.float32))
+def simulation_to_activation(params: HuqceParams, cache: Optional[ResultCache] = None) -> torch.Tensor:
+    """Run HUQCE simulation and convert final wavefunction to activation tensor.
+
+    With a ``cache`` the simulation only runs the first time a given
+    ``params`` is requested.
+
+    The ``(n, 2)`` float32 result is a ``torch.view_as_real`` view of the
+    complex64 state, so ``params.dtype="complex64"`` runs are converted
+    without copying; complex128 states are cast once.
+    """
+    if cache is not None:
+        psi = cache.run(params)
+    else:
+        sim = HuqceSimulator(params)
+        psi = sim.run()
+    return complex_to_activation(psi)
+
+
+def complex_to_activation(psi: np.ndarray) -> torch.Tensor:
+    """``(..., 2)`` float32 tensor of the real and imaginary parts of ``psi``."""
+    # Map complex wavefunction to real-valued activations: real/imag pairs
+    # along a trailing axis, viewing the complex64 buffer without a copy
+    state = np.ascontiguousarray(psi, dtype=np.complex64)
+    return torch.view_as_real(torch.from_numpy(state))
 
 
-__all__ = ["simulation_to_activation"]
+__all__ = ["simulation_to_activation", "complex_to_activation"]
@@ -0,0 +1,95 @@
+"""Streaming HUQCE activations for training loops."""
+
+from __future__ import annotations
+
+import itertools
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+import torch
+from torch.utils.data import DataLoader, IterableDataset, get_worker_info
+
+from holland_dual.quantum.huqce.cache import ResultCache
+from holland_dual.quantum.huqce.simulation import HuqceParams
+
+from .adapter import simulation_to_activation
+
+
+class SimulationActivationDataset(IterableDataset):
+    """Yield :func:`simulation_to_activation` tensors for a stream of params.
+
+    Under a ``DataLoader`` with ``num_workers > 0`` the simulations run in
+    the worker processes, each worker taking every ``num_workers``-th item
+    of ``params``, while the main process keeps training. The
+    ``(n, 2)`` activations are ``torch.view_as_real`` views of the
+    simulated state; the loader places that storage in shared memory and
+    the main process maps it. With ``dtype="complex64"`` params and
+    ``batch_size=None`` there is no stacking, casting or collation copy on
+    the way.
+
+    The same dataset can be passed as ``train_dataset`` to
+    :class:`~hcse.pipeline.HfTrainerWithHCSE`. Set
+    ``dataloader_num_workers`` (and optionally ``dataloader_prefetch_factor``)
+    and ``max_steps`` in the training arguments, since the stream has no
+    length.
+
+    Parameters
+    ----------
+    params : Iterable[HuqceParams]
+        Configurations to simulate. Each worker iterates its own copy, so
+        the iterable must be re-iterable, e.g. a list or an
+        ``itertools.repeat``/``cycle`` object for an endless stream.
+    transform : callable, optional
+        ``transform(activations, params)`` maps every tensor to a training
+        sample, e.g. the model's input dict. Defaults to the tensor itself.
+    cache : ResultCache, optional
+        Shared on-disk cache, so repeated params are simulated only once
+        across workers and epochs.
+    """
+
+    def __init__(
+        self,
+        params: Iterable[HuqceParams],
+        transform: Optional[Callable[[torch.Tensor, HuqceParams], Any]] = None,
+        cache: Optional[ResultCache] = None,
+    ) -> None:
+        super().__init__()
+        self.params = params
+        self.transform = transform
+        self.cache = cache
+
+    def __iter__(self) -> Iterator[Any]:
+        stream: Iterable[HuqceParams] = self.params
+        worker = get_worker_info()
+        if worker is not None:
+            stream = itertools.islice(stream, worker.id, None, worker.num_workers)
+        for params in stream:
+            activations = simulation_to_activation(params, cache=self.cache)
+            yield activations if self.transform is None else self.transform(activations, params)
+
+
+def simulation_loader(
+    params: Iterable[HuqceParams],
+    num_workers: int = 2,
+    prefetch_factor: int = 2,
+    transform: Optional[Callable[[torch.Tensor, HuqceParams], Any]] = None,
+    cache: Optional[ResultCache] = None,
+    **loader_kwargs: Any,
+) -> DataLoader:
+    """``DataLoader`` prefetching :class:`SimulationActivationDataset` samples.
+
+    Up to ``num_workers * prefetch_factor`` simulations run ahead of the
+    consumer. Samples are unbatched (``batch_size=None``) unless a batch
+    size is passed in ``loader_kwargs``.
+    """
+    loader_kwargs.setdefault("batch_size", None)
+    if num_workers > 0:
+        loader_kwargs.setdefault("prefetch_factor", prefetch_factor)
+        loader_kwargs.setdefault("persistent_workers", True)
+    return DataLoader(
+        SimulationActivationDataset(params, transform=transform, cache=cache),
+        num_workers=num_workers,
+        **loader_kwargs,
+    )
+
+
+__all__ = ["SimulationActivationDataset", "simulation_loader"]
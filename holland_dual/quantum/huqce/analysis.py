@@ -1,5 +1,5 @@
 from __future__ import annotations
 
-from huqce.analysis import spectral_entropy
+from huqce.analysis import WINDOWS, spectral_entropies, spectral_entropy
 
-__all__ = ["spectral_entropy"]
+__all__ = ["spectral_entropy", "spectral_entropies", "WINDOWS"]
@@ -0,0 +1,5 @@
+from __future__ import annotations
+
+from huqce.cache import ResultCache, params_key
+
+__all__ = ["ResultCache", "params_key"]
@@ -0,0 +1,5 @@
+from __future__ import annotations
+
+from huqce.checkpoint import Checkpoint, save_checkpoint, load_checkpoint
+
+__all__ = ["Checkpoint", "save_checkpoint", "load_checkpoint"]
@@ -0,0 +1,5 @@
+from __future__ import annotations
+
+from huqce.ensemble import HuqceEnsemble
+
+__all__ = ["HuqceEnsemble"]
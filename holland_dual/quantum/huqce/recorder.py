@@ -0,0 +1,5 @@
+from __future__ import annotations
+
+from huqce.recorder import TrajectoryRecorder, load_trajectory, metadata_path
+
+__all__ = ["TrajectoryRecorder", "load_trajectory", "metadata_path"]
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from huqce.sweep import (
+    SweepResult,
+    param_grid,
+    load_sweep,
+    parse_range,
+    run_sweep,
+    results_header,
+)
+
+__all__ = [
+    "SweepResult",
+    "param_grid",
+    "load_sweep",
+    "parse_range",
+    "run_sweep",
+    "results_header",
+]
@@ -0,0 +1,301 @@
+"""Reproducible CPU benchmark suite for the HCSE surrogates and HUQCE solvers.
+
+Each case is timed as the best and median of ``repeat`` calls after one
+warm-up call. The warm-up call also measures the case's own peak memory
+(see :func:`case_peak_mb`), so the memory already held by the process, such
+as the imported libraries, is not attributed to it. Results are written as
+JSON together with the library versions and thread counts, and a previous
+file can be passed as a baseline to flag slowdowns and memory growth.
+"""
+
+from __future__ import annotations
+
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from itertools import product
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from holland_dual.quantum.huqce.simulation import HuqceParams, HuqceSimulator
+from holland_dual.quantum.huqce.solver import (
+    compute_momentum_expectation,
+    crank_nicolson_step,
+    crank_nicolson_step_banded,
+    laplacian_bands,
+)
+
+SUITES = ("hcse", "huqce")
+
+Case = Tuple[str, str, Dict[str, Any], Callable[[], object]]
+
+# (batch, seq, hidden) grids for the HCSE surrogates
+HCSE_GRID = {"batch": (4, 16), "seq": (128, 512), "hidden": (256, 768)}
+HCSE_QUICK_GRID = {"batch": (2,), "seq": (32,), "hidden": (32, 64)}
+# grid sizes for the HUQCE solvers
+HUQCE_SIZES = (64, 256, 1024)
+HUQCE_QUICK_SIZES = (16, 32)
+
+
+def _proc_status_kib(field: str) -> int:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    raise OSError(f"{field} missing from /proc/self/status")
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the kernel's RSS high-water mark (Linux only)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def case_peak_mb(fn: Callable[[], object]) -> float:
+    """Peak memory in MiB that one call of ``fn`` adds to the process.
+
+    On Linux the RSS high-water mark is reset before the call and the RSS
+    held before it is subtracted, so native allocations (NumPy, torch) are
+    included. Elsewhere the peak of the Python and NumPy allocations traced
+    by :mod:`tracemalloc` is used; torch tensors are not seen there.
+    """
+    gc.collect()
+    if _reset_peak_rss():
+        try:
+            before = _proc_status_kib("VmRSS")
+            fn()
+            return max(_proc_status_kib("VmHWM") - before, 0) / 2**10
+        except OSError:
+            pass
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def time_case(fn: Callable[[], object], repeat: int = 5, warmup: int = 1) -> Dict[str, float]:
+    """Best and median wall-clock seconds of ``repeat`` calls."""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {"best_s": min(times), "median_s": statistics.median(times)}
+
+
+def hcse_cases(quick: bool = False) -> Iterator[Case]:
+    """``compute_hcse_surrogates``, ``info_nce_loss`` and ``corrcoef`` cases.
+
+    The ρ/Ė kernels are timed as ``hcse_statistics`` with a ``variant``
+    parameter: ``reference`` (the untiled :func:`~hcse.utils.connectivity_density`
+    plus mean square, the default path of ``compute_hcse_surrogates``),
+    ``fused`` and, outside quick runs, ``compiled``.
+    """
+    import torch
+    from torch import nn
+
+    from hcse.core import HCSEMixin
+    from hcse.utils import (
+        compiled_fused_statistics,
+        connectivity_density,
+        corrcoef,
+        fused_statistics,
+        info_nce_loss,
+    )
+
+    def reference_statistics(matrix: torch.Tensor) -> object:
+        return connectivity_density(matrix), matrix.pow(2).mean(dim=(-2, -1))
+
+    variants: Dict[str, Callable[[torch.Tensor], object]] = {
+        "reference": reference_statistics,
+        "fused": fused_statistics,
+    }
+    if not quick:
+        variants["compiled"] = compiled_fused_statistics
+
+    class Base(nn.Module):
+        def __init__(self, hidden_size: int) -> None:
+            super().__init__()
+
+    class Probe(HCSEMixin, Base):
+        pass
+
+    grid = HCSE_QUICK_GRID if quick else HCSE_GRID
+    generator = torch.Generator().manual_seed(0)
+    for batch, seq, hidden in product(grid["batch"], grid["seq"], grid["hidden"]):
+        params = {"batch": batch, "seq": seq, "hidden": hidden}
+        model = Probe(hidden_size=hidden)
+        states = torch.randn(batch, seq, hidden, generator=generator)
+        flat = states.reshape(batch * seq, hidden)
+
+        def surrogates(model: Probe = model, states: torch.Tensor = states) -> object:
+            with torch.no_grad():
+                return model.compute_hcse_surrogates(states)
+
+        def infonce(flat: torch.Tensor = flat) -> object:
+            with torch.no_grad():
+                return info_nce_loss(flat)
+
+        def correlation(flat: torch.Tensor = flat) -> object:
+            with torch.no_grad():
+                return corrcoef(flat)
+
+        yield "hcse", "compute_hcse_surrogates", params, surrogates
+        yield "hcse", "info_nce_loss", params, infonce
+        yield "hcse", "corrcoef", params, correlation
+        for variant, kernel in variants.items():
+
+            def kernel_case(flat: torch.Tensor = flat, kernel: Callable[[torch.Tensor], object] = kernel) -> object:
+                with torch.no_grad():
+                    return kernel(flat)
+
+            yield "hcse", "hcse_statistics", dict(params, variant=variant), kernel_case
+
+
+def huqce_cases(quick: bool = False) -> Iterator[Case]:
+    """Single-step solver and full ``HuqceSimulator.run`` cases."""
+    sizes = HUQCE_QUICK_SIZES if quick else HUQCE_SIZES
+    steps = 10 if quick else 50
+    for n in sizes:
+        params = HuqceParams(n=n, steps=steps)
+        sim = HuqceSimulator(params)
+        dense = sim.laplacian
+        bands = laplacian_bands(n, params.dx)
+        psi = sim.psi
+        p_exp = compute_momentum_expectation(psi, params.dx)
+        coeffs = (params.dt, params.gamma, params.alpha, params.epsilon, p_exp)
+
+        def dense_step(psi: np.ndarray = psi, lap: Any = dense, coeffs: Tuple = coeffs) -> object:
+            return crank_nicolson_step(psi, lap, *coeffs)
+
+        def banded_step(psi: np.ndarray = psi, bands: np.ndarray = bands, coeffs: Tuple = coeffs) -> object:
+            return crank_nicolson_step_banded(psi, bands, *coeffs)
+
+        yield "huqce", "crank_nicolson_step", {"n": n}, dense_step
+        yield "huqce", "crank_nicolson_step_banded", {"n": n}, banded_step
+        for method, banded in (("crank_nicolson", False), ("crank_nicolson", True), ("split_step", False)):
+            run_params = HuqceParams(n=n, steps=steps, method=method, banded=banded)
+
+            def run(run_params: HuqceParams = run_params) -> object:
+                return HuqceSimulator(run_params).run()
+
+            case = {"n": n, "steps": steps, "method": method, "banded": banded}
+            yield "huqce", "HuqceSimulator.run", case, run
+
+
+def environment() -> Dict[str, Any]:
+    """Versions and thread settings that affect the timings."""
+    info: Dict[str, Any] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+    }
+    if "torch" in sys.modules:
+        torch = sys.modules["torch"]
+        info["torch"] = torch.__version__
+        info["torch_threads"] = torch.get_num_threads()
+    return info
+
+
+def run_benchmarks(
+    suites: Sequence[str] = SUITES,
+    quick: bool = False,
+    repeat: int = 5,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Run the selected suites and return ``{"environment", "results"}``.
+
+    Each result holds ``suite``, ``name``, ``params``, ``best_s``,
+    ``median_s`` and ``peak_mb``. ``progress`` is called with every result
+    as soon as it is measured.
+    """
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        raise ValueError(f"unknown suites {sorted(unknown)}; expected a subset of {SUITES}")
+    factories = {"hcse": hcse_cases, "huqce": huqce_cases}
+    results: List[Dict[str, Any]] = []
+    for suite in suites:
+        for suite_name, name, params, fn in factories[suite](quick):
+            result: Dict[str, Any] = {"suite": suite_name, "name": name, "params": params}
+            # the measured call doubles as the warm-up
+            peak = case_peak_mb(fn)
+            result.update(time_case(fn, repeat=repeat, warmup=0))
+            result["peak_mb"] = peak
+            results.append(result)
+            if progress is not None:
+                progress(result)
+    return {"environment": environment(), "results": results}
+
+
+def result_key(result: Dict[str, Any]) -> str:
+    """Stable identifier of a case across runs."""
+    params = ",".join(f"{key}={value}" for key, value in sorted(result["params"].items()))
+    return f"{result['suite']}/{result['name']}[{params}]"
+
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    tolerance: float = 0.25,
+    memory_floor_mb: float = 1.0,
+) -> List[str]:
+    """Describe every case whose best time or peak memory grew by more than ``tolerance``.
+
+    Memory growth below ``memory_floor_mb`` is ignored as allocator noise.
+    Cases present in only one of the runs, and memory of baselines recorded
+    without ``peak_mb``, are ignored.
+    """
+    previous = {result_key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        old = previous.get(result_key(result))
+        if old is None:
+            continue
+        if old["best_s"] > 0:
+            ratio = result["best_s"] / old["best_s"]
+            if ratio > 1.0 + tolerance:
+                regressions.append(
+                    f"{result_key(result)}: {old['best_s'] * 1e3:.3f}ms -> "
+                    f"{result['best_s'] * 1e3:.3f}ms ({ratio:.2f}x)"
+                )
+        old_peak, peak = old.get("peak_mb"), result.get("peak_mb")
+        if old_peak is None or peak is None:
+            continue
+        if peak - old_peak > max(memory_floor_mb, tolerance * old_peak):
+            regressions.append(f"{result_key(result)}: peak {old_peak:.1f}MiB -> {peak:.1f}MiB")
+    return regressions
+
+
+def load_results(path: Union[str, Path]) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text())
+
+
+__all__ = [
+    "SUITES",
+    "case_peak_mb",
+    "compare_results",
+    "environment",
+    "hcse_cases",
+    "huqce_cases",
+    "load_results",
+    "result_key",
+    "run_benchmarks",
+    "time_case",
+]
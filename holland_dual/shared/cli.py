@@ -1,47 +1,147 @@
 from __future__ import annotations
 
+import csv
 import json
+import sys
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import typer
 
 from holland_dual.quantum.huqce.simulation import HuqceParams, HuqceSimulator
 from holland_dual.quantum.huqce.analysis import spectral_entropy
-from holland_dual.fusion.adapter import simulation_to_activation
+from holland_dual.quantum.huqce.cache import ResultCache
+from holland_dual.quantum.huqce.sweep import (
+    load_sweep,
+    param_grid,
+    parse_range,
+    results_header,
+    run_sweep,
+)
 
+# Commands that need torch (hdf-fuse, hdq-bench) import it themselves so the
+# NumPy-only commands start without loading torch or transformers.
 app = typer.Typer(help="Holland Dual CLI")
 
 
 @app.command()
-def hdq_sim(config: Optional[Path] = None) -> None:
-    """Run HUQCE simulation."""
-    params = HuqceParams()
-    if config and config.exists():
-        data = json.loads(config.read_text())
-        params = HuqceParams(**data)
-    sim = HuqceSimulator(params)
-    psi = sim.run()
+def hdq_sim(
+    config: Optional[Path] = None,
+    record: Optional[Path] = None,
+    every: int = 1,
+    checkpoint: Optional[Path] = None,
+    checkpoint_every: int = 100,
+    resume: bool = False,
+) -> None:
+    """Run HUQCE simulation, optionally recording the trajectory to a .npy file.
+
+    With --checkpoint the state is saved every --checkpoint-every steps;
+    --resume continues from that file when it exists.
+    """
+    if resume and checkpoint and checkpoint.exists():
+        sim = HuqceSimulator.resume(checkpoint)
+    else:
+        params = HuqceParams()
+        if config and config.exists():
+            data = json.loads(config.read_text())
+            params = HuqceParams(**data)
+        sim = HuqceSimulator(params)
+    psi = sim.run(
+        record=record,
+        every=every,
+        checkpoint=checkpoint,
+        checkpoint_every=checkpoint_every,
+    )
     print(psi[-5:])  # preview
+    if sim.params.adaptive:
+        print(f"t={sim.time:g}: {sim.accepted_steps} accepted, {sim.rejected_steps} rejected steps")
+
+
+CACHE_DIR_OPTION = typer.Option(
+    None,
+    envvar="HUQCE_CACHE_DIR",
+    help="Reuse results for identical params from this cache directory.",
+)
 
 
 @app.command()
-def hdf_fuse() -> None:
+def hdf_fuse(cache_dir: Optional[Path] = CACHE_DIR_OPTION) -> None:
     """Demonstrate fusion adapter."""
-    acts = simulation_to_activation(HuqceParams(steps=10))
+    from holland_dual.fusion.adapter import simulation_to_activation
+
+    cache = ResultCache(cache_dir) if cache_dir else None
+    acts = simulation_to_activation(HuqceParams(steps=10), cache=cache)
     print(acts.shape)
 
 
 @app.command()
-def hdq_analyze(steps: int = 50) -> None:
+def hdq_analyze(steps: int = 50, cache_dir: Optional[Path] = CACHE_DIR_OPTION) -> None:
     """Run simulation and print spectral entropy."""
     params = HuqceParams(steps=steps)
-    sim = HuqceSimulator(params)
-    psi = sim.run()
+    if cache_dir:
+        psi = ResultCache(cache_dir).run(params)
+    else:
+        sim = HuqceSimulator(params)
+        psi = sim.run()
     ent = spectral_entropy(psi)
     print(f"spectral entropy: {ent:.4f}")
 
 
+@app.command()
+def hdq_sweep(
+    config: Optional[Path] = typer.Option(None, help="JSON list of params or {base, grid} object."),
+    grid: List[str] = typer.Option([], help="Range as FIELD=V1,V2,...; repeat for a cartesian grid."),
+    workers: Optional[int] = typer.Option(None, help="Process pool size (default: all cores)."),
+    output: Optional[Path] = typer.Option(None, help="CSV results file (default: stdout)."),
+) -> None:
+    """Run a parameter sweep in parallel and stream a results table."""
+    params_list = load_sweep(config) if config else [HuqceParams()]
+    if grid:
+        ranges = {}
+        for spec in grid:
+            ranges.update(parse_range(spec))
+        params_list = [p for base in params_list for p in param_grid(base, **ranges)]
+    handle = output.open("w", newline="") if output else sys.stdout
+    try:
+        writer = csv.DictWriter(handle, fieldnames=results_header())
+        writer.writeheader()
+        for result in run_sweep(params_list, workers=workers):
+            writer.writerow(result.row())
+            handle.flush()
+    finally:
+        if output:
+            handle.close()
+
+
+@app.command()
+def hdq_bench(
+    output: Path = typer.Option(Path("benchmarks.json"), help="JSON results file."),
+    suite: List[str] = typer.Option([], help="Suite to run (hcse or huqce); repeat for several. Default: all."),
+    quick: bool = typer.Option(False, help="Small sizes only, for smoke runs."),
+    repeat: int = typer.Option(5, help="Timed calls per case."),
+    baseline: Optional[Path] = typer.Option(None, help="Earlier results to compare against."),
+    tolerance: float = typer.Option(0.25, help="Allowed relative slowdown or memory growth before failing."),
+) -> None:
+    """Benchmark the HCSE surrogates and HUQCE solvers and save JSON results.
+
+    With --baseline the exit code is 1 when any case slowed down, or grew
+    its peak memory, by more than --tolerance.
+    """
+    from holland_dual.shared.benchmarks import SUITES, compare_results, load_results, result_key, run_benchmarks
+
+    def report(result: dict) -> None:
+        print(f"{result_key(result)}: best {result['best_s'] * 1e3:.3f}ms, peak {result['peak_mb']:.1f} MiB")
+
+    results = run_benchmarks(suite or SUITES, quick=quick, repeat=repeat, progress=report)
+    output.write_text(json.dumps(results, indent=2))
+    if baseline is not None:
+        regressions = compare_results(load_results(baseline), results, tolerance=tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            raise typer.Exit(code=1)
+
+
 cli = app
 
-__all__ = ["cli", "hdq_sim", "hdf_fuse", "hdq_analyze"]
+__all__ = ["cli", "hdq_sim", "hdf_fuse", "hdq_analyze", "hdq_sweep", "hdq_bench"]
@@ -1,3 +1,5 @@
+import json
+
 from typer.testing import CliRunner
 import numpy as np
 import warnings
@@ -13,3 +15,81 @@ def test_hdq_analyze():
         result = runner.invoke(app, ["hdq-analyze", "--steps", "5"])
     assert result.exit_code == 0
     assert "spectral entropy" in result.stdout
+
+
+def test_hdq_sweep(tmp_path):
+    runner = CliRunner()
+    out = tmp_path / "results.csv"
+    result = runner.invoke(
+        app,
+        ["hdq-sweep", "--grid", "steps=1,2", "--grid", "n=8,16", "--workers", "2", "--output", str(out)],
+    )
+    assert result.exit_code == 0, result.output
+    lines = out.read_text().splitlines()
+    assert lines[0].startswith("index,")
+    assert len(lines) == 5
+
+
+def test_hdq_sim_record(tmp_path):
+    runner = CliRunner()
+    out = tmp_path / "traj.npy"
+    config = tmp_path / "params.json"
+    config.write_text('{"n": 8, "steps": 4}')
+    result = runner.invoke(app, ["hdq-sim", "--config", str(config), "--record", str(out), "--every", "2"])
+    assert result.exit_code == 0, result.output
+    assert np.load(out).shape == (3, 8)
+
+
+def test_hdq_sim_resume(tmp_path):
+    runner = CliRunner()
+    ckpt = tmp_path / "ckpt.npz"
+    config = tmp_path / "params.json"
+    config.write_text('{"n": 8, "steps": 4}')
+    args = ["hdq-sim", "--config", str(config), "--checkpoint", str(ckpt), "--checkpoint-every", "2"]
+    assert runner.invoke(app, args).exit_code == 0
+    assert ckpt.exists()
+    result = runner.invoke(app, args + ["--resume"])
+    assert result.exit_code == 0, result.output
+
+
+def test_hdq_bench(tmp_path):
+    runner = CliRunner()
+    out = tmp_path / "bench.json"
+    args = ["hdq-bench", "--quick", "--repeat", "1", "--suite", "huqce", "--output", str(out)]
+    result = runner.invoke(app, args)
+    assert result.exit_code == 0, result.output
+    data = json.loads(out.read_text())
+    names = {entry["name"] for entry in data["results"]}
+    assert names == {"crank_nicolson_step", "crank_nicolson_step_banded", "HuqceSimulator.run"}
+    assert all(entry["best_s"] > 0 for entry in data["results"])
+    assert all(entry["peak_mb"] >= 0 for entry in data["results"])
+    assert "numpy" in data["environment"]
+
+    slower = dict(data, results=[dict(entry, best_s=entry["best_s"] / 10) for entry in data["results"]])
+    fast_baseline = tmp_path / "baseline.json"
+    fast_baseline.write_text(json.dumps(slower))
+    result = runner.invoke(app, args + ["--baseline", str(fast_baseline)])
+    assert result.exit_code == 1
+    assert "REGRESSION" in result.stdout
+
+
+def test_hdq_bench_hcse_statistics_variants(tmp_path):
+    out = tmp_path / "bench.json"
+    args = ["hdq-bench", "--quick", "--repeat", "1", "--suite", "hcse", "--output", str(out)]
+    result = CliRunner().invoke(app, args)
+    assert result.exit_code == 0, result.output
+    results = json.loads(out.read_text())["results"]
+    variants = {entry["params"]["variant"] for entry in results if entry["name"] == "hcse_statistics"}
+    assert variants == {"reference", "fused"}
+
+
+def test_benchmark_memory_is_per_case():
+    from holland_dual.shared.benchmarks import case_peak_mb, compare_results
+
+    small = case_peak_mb(lambda: np.zeros(16))
+    large = case_peak_mb(lambda: np.ones(2**23))
+    assert small < 8 <= 60 < large
+    result = {"suite": "huqce", "name": "case", "params": {}, "best_s": 1.0}
+    baseline = {"results": [dict(result, peak_mb=10.0)]}
+    assert compare_results(baseline, {"results": [dict(result, peak_mb=10.5)]}) == []
+    assert compare_results(baseline, {"results": [dict(result, peak_mb=20.0)]})
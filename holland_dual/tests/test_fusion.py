@@ -1,4 +1,7 @@
-from holland_dual.fusion.adapter import simulation_to_activation
+import torch
+
+from holland_dual.fusion.adapter import complex_to_activation, simulation_to_activation
+from holland_dual.fusion.dataset import SimulationActivationDataset, simulation_loader
 from holland_dual.quantum.huqce.simulation import HuqceParams
 import numpy as np
 import warnings
@@ -10,3 +13,24 @@ def test_adapter_shape():
         warnings.filterwarnings("error", category=ComplexWarning)
         acts = simulation_to_activation(HuqceParams(steps=1))
     assert acts.dim() == 2
+
+
+def test_activation_views_complex64_state():
+    psi = (np.arange(4) + 1j * np.arange(4, 8)).astype(np.complex64)
+    acts = complex_to_activation(psi)
+    assert acts.shape == (4, 2) and acts.dtype == torch.float32
+    assert acts.data_ptr() == psi.__array_interface__["data"][0]
+    legacy = np.stack([psi.real, psi.imag], axis=-1).astype(np.float32)
+    assert np.array_equal(complex_to_activation(psi.astype(np.complex128)).numpy(), legacy)
+
+
+def test_simulation_loader_prefetches_in_workers():
+    params = [HuqceParams(n=16, steps=steps, dtype="complex64") for steps in range(1, 6)]
+    loader = simulation_loader(params, num_workers=2, transform=lambda acts, p: (p.steps, acts))
+    samples = dict(loader)
+    assert sorted(samples) == [1, 2, 3, 4, 5]
+    for p in params:
+        assert torch.equal(samples[p.steps], simulation_to_activation(p))
+    assert samples[1].shape == (16, 2)
+    serial = list(SimulationActivationDataset(params[:2]))
+    assert torch.equal(serial[1], samples[2])
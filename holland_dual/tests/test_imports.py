@@ -0,0 +1,40 @@
+import subprocess
+import sys
+
+HEAVY = ("torch", "transformers", "hcse")
+
+
+def loaded_after(code):
+    script = code + "\nimport sys\nprint(' '.join(m for m in %r if m in sys.modules))" % (HEAVY,)
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+def test_cli_import_skips_torch():
+    assert loaded_after("import holland_dual.shared.cli") == []
+
+
+def test_numpy_commands_skip_torch():
+    code = (
+        "from typer.testing import CliRunner\n"
+        "from holland_dual.shared.cli import app\n"
+        "for args in (['hdq-sim', '--config', 'missing.json'], ['hdq-analyze', '--steps', '2']):\n"
+        "    assert CliRunner().invoke(app, args).exit_code == 0\n"
+    )
+    assert loaded_after(code) == []
+
+
+def test_lazy_subpackages():
+    assert loaded_after("import holland_dual, holland_dual.quantum, holland_dual.cognition") == []
+    loaded = loaded_after("from holland_dual.cognition import HCSEMixin")
+    assert "torch" in loaded and "hcse" in loaded
+    assert "torch" in loaded_after("from holland_dual.fusion import simulation_to_activation")
+
+
+def test_quantum_mirror_matches_huqce():
+    import importlib
+
+    for name in ("", ".analysis", ".simulation", ".solver"):
+        source = importlib.import_module("huqce" + name)
+        mirror = importlib.import_module("holland_dual.quantum.huqce" + name)
+        assert sorted(mirror.__all__) == sorted(source.__all__), name
@@ -1,11 +1,32 @@
 from .simulation import HuqceParams, HuqceSimulator
-from .solver import crank_nicolson_step, compute_momentum_expectation
-from .analysis import spectral_entropy
+from .ensemble import HuqceEnsemble
+from .solver import (
+    crank_nicolson_step,
+    crank_nicolson_step_banded,
+    split_step_fourier_step,
+    compute_momentum_expectation,
+    solve_tridiagonal,
+)
+from .analysis import spectral_entropy, spectral_entropies
+from .sweep import SweepResult, param_grid, run_sweep
+from .recorder import TrajectoryRecorder, load_trajectory
+from .cache import ResultCache
 
 __all__ = [
     "HuqceParams",
     "HuqceSimulator",
+    "HuqceEnsemble",
     "crank_nicolson_step",
+    "crank_nicolson_step_banded",
+    "split_step_fourier_step",
     "compute_momentum_expectation",
+    "solve_tridiagonal",
     "spectral_entropy",
+    "spectral_entropies",
+    "SweepResult",
+    "param_grid",
+    "run_sweep",
+    "TrajectoryRecorder",
+    "load_trajectory",
+    "ResultCache",
 ]
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import asdict
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+from .simulation import HuqceParams, HuqceSimulator
+from .solver import SOLVER_VERSION
+
+
+def params_key(params: HuqceParams) -> str:
+    """Stable content hash of ``params`` and the solver version."""
+    payload = json.dumps(
+        {"params": asdict(params), "solver_version": SOLVER_VERSION},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """On-disk cache of final ``psi`` states keyed on :func:`params_key`.
+
+    Each entry is a ``<key>.npy`` file. Hits refresh the file's mtime and
+    the least recently used entries are evicted once the directory grows
+    beyond ``max_bytes``.
+
+    Parameters
+    ----------
+    directory : str or Path, optional
+        Cache location; defaults to ``$HUQCE_CACHE_DIR`` or
+        ``~/.cache/huqce``.
+    max_bytes : int
+        Size budget for all entries together.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, Path]] = None,
+        max_bytes: int = 1 << 30,
+    ) -> None:
+        if directory is None:
+            directory = os.environ.get("HUQCE_CACHE_DIR") or Path.home() / ".cache" / "huqce"
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    def path(self, params: HuqceParams) -> Path:
+        return self.directory / f"{params_key(params)}.npy"
+
+    def get(self, params: HuqceParams) -> Optional[np.ndarray]:
+        """Return the cached state for ``params`` or ``None`` on a miss."""
+        path = self.path(params)
+        try:
+            psi = np.load(path)
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # evicted by another process after the load; the data is intact
+            pass
+        return psi
+
+    def put(self, params: HuqceParams, psi: np.ndarray) -> None:
+        """Store ``psi`` for ``params`` and evict old entries if needed."""
+        path = self.path(params)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                np.save(handle, psi)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        self.evict()
+
+    def run(self, params: HuqceParams) -> np.ndarray:
+        """Return the final state for ``params``, simulating only on a miss."""
+        psi = self.get(params)
+        if psi is None:
+            psi = HuqceSimulator(params).run()
+            self.put(params, psi)
+        return psi
+
+    def evict(self) -> None:
+        """Delete least recently used entries until within ``max_bytes``."""
+        entries = []
+        for path in self.directory.glob("*.npy"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self) -> None:
+        for path in self.directory.glob("*.npy"):
+            path.unlink()
+
+
+__all__ = ["ResultCache", "params_key"]
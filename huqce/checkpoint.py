@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Union
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .simulation import HuqceParams
+
+
+@dataclass
+class Checkpoint:
+    """Simulator state restored by :func:`load_checkpoint`."""
+
+    psi: np.ndarray
+    step: int
+    end: Optional[int]
+    params: "HuqceParams"
+
+
+def save_checkpoint(
+    path: Union[str, Path],
+    psi: np.ndarray,
+    step: int,
+    params: "HuqceParams",
+    end: Optional[int] = None,
+) -> None:
+    """Atomically write simulator state to an ``.npz`` checkpoint.
+
+    The data is written to a temporary file in the destination directory,
+    fsynced and moved over ``path`` with :func:`os.replace`, so a job killed
+    mid-write leaves the previous checkpoint intact.
+
+    Parameters
+    ----------
+    path : str or Path
+        Checkpoint file.
+    psi : np.ndarray
+        Current wave function.
+    step : int
+        Number of steps taken so far.
+    params : HuqceParams
+        Parameters of the run.
+    end : int, optional
+        Step at which the interrupted ``run`` call would have stopped.
+    """
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            np.savez(
+                handle,
+                psi=psi,
+                step=step,
+                end=-1 if end is None else end,
+                params=json.dumps(asdict(params)),
+            )
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def load_checkpoint(path: Union[str, Path]) -> Checkpoint:
+    """Read a checkpoint written by :func:`save_checkpoint`."""
+    from .simulation import HuqceParams
+
+    with np.load(path) as data:
+        end = int(data["end"])
+        return Checkpoint(
+            psi=data["psi"],
+            step=int(data["step"]),
+            end=None if end < 0 else end,
+            params=HuqceParams(**json.loads(str(data["params"]))),
+        )
+
+
+__all__ = ["Checkpoint", "save_checkpoint", "load_checkpoint"]
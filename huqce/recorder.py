@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import json
+from dataclasses import asdict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Literal, Optional, Tuple, Union
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .simulation import HuqceParams
+
+
+def metadata_path(path: Union[str, Path]) -> Path:
+    """Location of the JSON header stored next to a trajectory ``.npy`` file."""
+    return Path(path).with_suffix(".json")
+
+
+class TrajectoryRecorder:
+    """Stream simulation states into a preallocated ``.npy`` memory map.
+
+    Frame ``j`` of the file holds the state after ``j * every`` steps, so a
+    run of ``steps`` steps produces ``steps // every + 1`` frames including
+    the initial state. Memory use is independent of the run length because
+    frames are written straight to the mapped file. A JSON header with the
+    ``HuqceParams`` used is written alongside (see :func:`metadata_path`).
+
+    Parameters
+    ----------
+    path : str or Path
+        Destination ``.npy`` file, overwritten if it exists.
+    params : HuqceParams
+        Parameters of the run; determine the frame shape and count. Frames
+        of a ``dims``-dimensional run have shape ``(n,) * dims``.
+    every : int
+        Record every ``every``-th step.
+    dtype : numpy dtype
+        Element type of the stored states.
+    append : bool
+        Reopen an existing trajectory at ``path`` for writing instead of
+        creating a new one, e.g. when a run is resumed from a checkpoint.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        params: "HuqceParams",
+        every: int = 1,
+        dtype: Any = complex,
+        append: bool = False,
+    ) -> None:
+        if every < 1:
+            raise ValueError("every must be a positive integer")
+        self.path = Path(path)
+        self.params = params
+        self.every = every
+        self.recorded = 0
+        shape = (params.steps // every + 1,) + (params.n,) * params.dims
+        if append and self.path.exists():
+            self.frames = np.lib.format.open_memmap(self.path, mode="r+")
+            if self.frames.shape != shape:
+                raise ValueError(
+                    f"cannot append to {self.path}: shape {self.frames.shape} != {shape}"
+                )
+            self.recorded = json.loads(metadata_path(self.path).read_text())["recorded"]
+        else:
+            self.frames = np.lib.format.open_memmap(self.path, mode="w+", dtype=dtype, shape=shape)
+        self._write_metadata()
+
+    def _write_metadata(self) -> None:
+        meta = {
+            "params": asdict(self.params),
+            "every": self.every,
+            "frames": self.frames.shape[0],
+            "recorded": self.recorded,
+        }
+        metadata_path(self.path).write_text(json.dumps(meta, indent=2))
+
+    def record(self, step: int, psi: np.ndarray) -> None:
+        """Store ``psi`` if ``step`` falls on the recording interval."""
+        if step % self.every:
+            return
+        frame = step // self.every
+        if frame >= self.frames.shape[0]:
+            raise IndexError(f"step {step} exceeds the preallocated trajectory")
+        self.frames[frame] = psi
+        self.recorded = max(self.recorded, frame + 1)
+
+    def flush(self) -> None:
+        """Write pending frames to disk and update the header."""
+        self.frames.flush()
+        self._write_metadata()
+
+    def close(self) -> None:
+        """Flush the trajectory; the file stays readable via :func:`load_trajectory`."""
+        self.flush()
+
+    def __enter__(self) -> "TrajectoryRecorder":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def load_trajectory(
+    path: Union[str, Path],
+    mmap_mode: Optional[Literal["r", "r+", "c"]] = "r",
+) -> Tuple[np.ndarray, "HuqceParams", Dict[str, Any]]:
+    """Open a recorded trajectory without copying it into memory.
+
+    Returns
+    -------
+    tuple
+        ``(frames, params, metadata)`` where ``frames`` is a
+        ``(frames, n)`` memory map, ``(frames, n, ..., n)`` for
+        ``params.dims > 1`` (or an array when ``mmap_mode`` is ``None``),
+        and ``metadata`` is the decoded JSON header.
+    """
+    from .simulation import HuqceParams
+
+    meta = json.loads(metadata_path(path).read_text())
+    frames = np.load(path, mmap_mode=mmap_mode)
+    return frames, HuqceParams(**meta["params"]), meta
+
+
+__all__ = ["TrajectoryRecorder", "load_trajectory", "metadata_path"]
@@ -2,8 +2,23 @@ from __future__ import annotations
 
 import numpy as np
 from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
 
-from .solver import crank_nicolson_step, compute_momentum_expectation
+from .checkpoint import load_checkpoint, save_checkpoint
+from .recorder import TrajectoryRecorder
+from .solver import (
+    crank_nicolson_step,
+    crank_nicolson_step_adi,
+    crank_nicolson_step_banded,
+    split_step_fourier_step,
+    compute_momentum_expectation,
+    kinetic_propagator,
+    laplacian_bands,
+)
+
+METHODS = ("crank_nicolson", "split_step")
+DTYPES = ("complex128", "complex64")
 
 
 @dataclass
@@ -15,35 +30,246 @@ class HuqceParams:
     gamma: float = 0.01
     alpha: float = 0.005
     epsilon: float = 0.1
+    banded: bool = False
+    method: str = "crank_nicolson"
+    # spatial axes; the grid has n points along each
+    dims: int = 1
+    # adaptive mode: dt is the first trial step, run() integrates to t_end
+    # (default steps * dt) keeping the step-doubling error within rtol/atol
+    adaptive: bool = False
+    t_end: Optional[float] = None
+    rtol: float = 1e-4
+    atol: float = 1e-6
+    # precision of the state, operators and solves
+    dtype: str = "complex128"
 
 
 class HuqceSimulator:
+    """Integrate HUQCE on a 1D grid or a ``(n,) * dims`` grid.
+
+    With ``dims > 1`` the Crank-Nicolson method always uses the ADI solver
+    (:func:`~huqce.solver.crank_nicolson_step_adi`) on the banded per-axis
+    factors of the Kronecker-sum Laplacian, and the split-step method
+    applies the kinetic term with ``np.fft.fftn``. The initial state is the
+    product of the 1D ground states.
+
+    With ``params.adaptive`` set, :meth:`run` delegates to
+    :meth:`run_adaptive`.
+
+    ``params.dtype="complex64"`` keeps the state, the operators (stored as
+    float32 or complex64) and every solve in single precision.
+    """
+
     def __init__(self, params: HuqceParams) -> None:
         self.params = params
+        self.step_count = 0
+        # adaptive mode bookkeeping, see run_adaptive()
+        self.time = 0.0
+        self.dt = params.dt
+        self.accepted_steps = 0
+        self.rejected_steps = 0
+        # end step of an interrupted run() restored by resume()
+        self._run_end: Optional[int] = None
         x = np.linspace(0, params.n * params.dx, params.n)
         self.psi = np.sqrt(2 / (params.n * params.dx)) * np.sin(np.pi * x / (params.n * params.dx))
-        self.psi = self.psi.astype(complex)
-        diag = -2 * np.ones(params.n)
-        off = np.ones(params.n - 1)
-        lap = (np.diag(diag) + np.diag(off, 1) + np.diag(off, -1)) / params.dx**2
-        self.laplacian = lap
+        if params.method not in METHODS:
+            raise ValueError(f"unknown method {params.method!r}; expected one of {METHODS}")
+        if params.dtype not in DTYPES:
+            raise ValueError(f"unknown dtype {params.dtype!r}; expected one of {DTYPES}")
+        self.dtype = np.dtype(params.dtype)
+        real = np.finfo(self.dtype).dtype
+        self.psi = self.psi.astype(self.dtype)
+        if params.dims < 1:
+            raise ValueError("dims must be a positive integer")
+        ground = self.psi
+        for _ in range(params.dims - 1):
+            self.psi = np.multiply.outer(self.psi, ground)
+        self.laplacian: Optional[np.ndarray] = None
+        self.propagator: Optional[np.ndarray] = None
+        if params.method == "split_step":
+            # periodic grid, kinetic term applied in k-space
+            self.propagator = self._propagator(params.dt)
+        elif params.dims > 1:
+            # one (3, n) factor per axis of the Kronecker-sum Laplacian
+            bands = laplacian_bands(params.n, params.dx).astype(real)
+            self.laplacian = np.stack([bands] * params.dims)
+        elif params.banded:
+            # (3, n) diagonals only; the dense matrix is never built
+            self.laplacian = laplacian_bands(params.n, params.dx).astype(real)
+        else:
+            diag = -2 * np.ones(params.n)
+            off = np.ones(params.n - 1)
+            lap = (np.diag(diag) + np.diag(off, 1) + np.diag(off, -1)) / params.dx**2
+            self.laplacian = lap.astype(real)
+
+    def _propagator(self, dt: float) -> np.ndarray:
+        params = self.params
+        return kinetic_propagator(params.n, params.dx, dt, params.dims).astype(self.dtype)
+
+    @classmethod
+    def resume(cls, path: Union[str, Path]) -> "HuqceSimulator":
+        """Restore a simulator from a checkpoint written during :meth:`run`.
+
+        The next :meth:`run` call finishes the interrupted run instead of
+        starting a new one of ``params.steps`` steps.
+        """
+        state = load_checkpoint(path)
+        sim = cls(state.params)
+        sim.psi = state.psi
+        sim.step_count = state.step
+        sim._run_end = state.end
+        return sim
+
+    def save_checkpoint(self, path: Union[str, Path]) -> None:
+        """Atomically write ``psi``, the step counter and params to ``path``."""
+        save_checkpoint(path, self.psi, self.step_count, self.params, end=self._run_end)
 
     def step(self) -> None:
-        p_exp = compute_momentum_expectation(self.psi, self.params.dx)
-        self.psi = crank_nicolson_step(
-            self.psi,
-            self.laplacian,
-            self.params.dt,
+        self.psi = self._advance(self.psi, self.params.dt)
+        self.step_count += 1
+
+    def _advance(self, psi: np.ndarray, dt: float) -> np.ndarray:
+        """One step of size ``dt`` from ``psi`` with the configured method."""
+        dims = self.params.dims
+        p_exp: Any
+        if dims > 1:
+            p_exp = np.asarray(compute_momentum_expectation(psi, self.params.dx, ndim=dims))
+        else:
+            p_exp = complex(compute_momentum_expectation(psi, self.params.dx))
+        stepper: Callable[..., np.ndarray]
+        if self.params.method == "split_step":
+            stepper, operator = split_step_fourier_step, self.propagator
+            if dt != self.params.dt:
+                operator = self._propagator(dt)
+        elif dims > 1:
+            stepper, operator = crank_nicolson_step_adi, self.laplacian
+        elif self.params.banded:
+            stepper, operator = crank_nicolson_step_banded, self.laplacian
+        else:
+            stepper, operator = crank_nicolson_step, self.laplacian
+        assert operator is not None
+        return stepper(
+            psi,
+            operator,
+            dt,
             self.params.gamma,
             self.params.alpha,
             self.params.epsilon,
             p_exp,
         )
 
-    def run(self) -> np.ndarray:
-        for _ in range(self.params.steps):
-            self.step()
+    def run_adaptive(
+        self,
+        t_end: Optional[float] = None,
+        rtol: Optional[float] = None,
+        atol: Optional[float] = None,
+        max_steps: int = 1_000_000,
+    ) -> np.ndarray:
+        """Integrate to time ``t_end`` with step-doubling error control.
+
+        Each trial step of size ``h`` is compared with two steps of ``h/2``.
+        The step is accepted when the norm of the difference is within
+        ``atol + rtol * ||psi||`` and the two-half-step state is kept. Either
+        way the next ``h`` is scaled by ``0.9 * err^(-1/2)``, since the
+        explicit chaos term makes the schemes first order in general,
+        limited to a factor between 0.2 and 5. A trial step is shortened to
+        land exactly on ``t_end``; if that shortened step is accepted, the
+        previous proposal is kept, so the clipping does not shrink later
+        steps. ``params.dt`` is the first trial step and the tolerances
+        default to ``params.rtol`` and ``params.atol``.
+
+        Afterwards ``accepted_steps`` and ``rejected_steps`` hold the step
+        counts, ``time`` the reached time and ``dt`` the next trial step.
+        """
+        params = self.params
+        if t_end is None:
+            t_end = params.t_end if params.t_end is not None else params.steps * params.dt
+        rtol = params.rtol if rtol is None else rtol
+        atol = params.atol if atol is None else atol
+        if rtol < 0 or atol < 0 or rtol + atol == 0:
+            raise ValueError("tolerances must be non-negative and not both zero")
+        h = self.dt
+        while self.time < t_end:
+            if self.accepted_steps + self.rejected_steps >= max_steps:
+                raise RuntimeError(f"adaptive run did not reach t={t_end} within {max_steps} steps")
+            # land exactly on t_end instead of overshooting it
+            trial = min(h, t_end - self.time)
+            if trial <= 1e-12 * max(t_end, 1.0):
+                raise RuntimeError(f"step size underflow at t={self.time}")
+            full = self._advance(self.psi, trial)
+            half = self._advance(self._advance(self.psi, 0.5 * trial), 0.5 * trial)
+            err = float(np.linalg.norm(half - full) / (atol + rtol * np.linalg.norm(half)))
+            factor = 5.0 if err == 0 else 0.9 * err ** (-0.5)
+            proposal = trial * min(5.0, max(0.2, factor))
+            if err <= 1.0:
+                self.psi = half
+                self.time += trial
+                self.accepted_steps += 1
+                # a clipped step says nothing against the unclipped proposal
+                h = proposal if trial == h else max(h, proposal)
+            else:
+                self.rejected_steps += 1
+                h = proposal
+            self.dt = h
+        return self.psi
+
+    def run(
+        self,
+        record: Optional[Union[str, Path]] = None,
+        every: int = 1,
+        checkpoint: Optional[Union[str, Path]] = None,
+        checkpoint_every: int = 100,
+    ) -> np.ndarray:
+        """Advance ``params.steps`` steps and return the final state.
+
+        When ``record`` is given, the initial state and every ``every``-th
+        step are written to that ``.npy`` file through a
+        :class:`TrajectoryRecorder`; read it back with ``load_trajectory``.
+
+        When ``checkpoint`` is given, the state is saved there every
+        ``checkpoint_every`` steps and once more at the end, so a killed job
+        restarted with :meth:`resume` loses at most one interval of work.
+        A resumed run keeps appending to an existing ``record`` file.
+
+        In adaptive mode the run goes to :meth:`run_adaptive`; recording
+        and checkpointing need a fixed step count and are not supported.
+        """
+        if self.params.adaptive:
+            if record is not None or checkpoint is not None:
+                raise ValueError("record and checkpoint are not supported with adaptive=True")
+            return self.run_adaptive()
+        if checkpoint is not None and checkpoint_every < 1:
+            raise ValueError("checkpoint_every must be a positive integer")
+        end = self._run_end if self._run_end is not None else self.step_count + self.params.steps
+        start = end - self.params.steps
+        self._run_end = end
+        recorder = None
+        if record is not None:
+            recorder = TrajectoryRecorder(
+                record,
+                self.params,
+                every,
+                dtype=self.psi.dtype,
+                append=self.step_count > start,
+            )
+            recorder.record(self.step_count - start, self.psi)
+        try:
+            while self.step_count < end:
+                self.step()
+                if recorder is not None:
+                    recorder.record(self.step_count - start, self.psi)
+                if checkpoint is not None and (self.step_count - start) % checkpoint_every == 0:
+                    if recorder is not None:
+                        recorder.flush()
+                    self.save_checkpoint(checkpoint)
+        finally:
+            if recorder is not None:
+                recorder.close()
+        if checkpoint is not None:
+            # resuming from a finished run is a no-op
+            self.save_checkpoint(checkpoint)
+        self._run_end = None
         return self.psi
 
 
-__all__ = ["HuqceParams", "HuqceSimulator"]
+__all__ = ["HuqceParams", "HuqceSimulator", "METHODS"]
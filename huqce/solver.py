@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+from typing import Sequence
+
 import numpy as np
 from numpy.typing import ArrayLike
 
+# Bump whenever a change alters the numbers produced for the same
+# HuqceParams; cached results from other versions are then ignored.
+SOLVER_VERSION = 1
+
 
 def crank_nicolson_step(
     psi: np.ndarray,
@@ -11,14 +17,16 @@ def crank_nicolson_step(
     gamma: float,
     alpha: float,
     epsilon: float,
-    momentum_expectation: float,
+    momentum_expectation: complex,
 ) -> np.ndarray:
     """Perform a single Crank-Nicolson step for 1D HUQCE.
 
     Parameters
     ----------
     psi : np.ndarray
-        Current wave function samples (complex64/complex128).
+        Current wave function samples (complex64/complex128). The step is
+        carried out in this precision as long as ``laplacian`` is real of
+        the matching width.
     laplacian : np.ndarray
         Discrete Laplacian matrix.
     dt : float
@@ -29,7 +37,7 @@ def crank_nicolson_step(
         Chaos coefficient.
     epsilon : float
         Chaos strength scaling.
-    momentum_expectation : float
+    momentum_expectation : complex
         Current expectation value of momentum operator.
 
     Returns
@@ -40,13 +48,14 @@ def crank_nicolson_step(
     i = 1j
     hbar = 1.0
     n = psi.size
+    dtype = np.result_type(psi, laplacian, 1j)
     # Hamiltonian matrix H = -(hbar^2/2m)L + gamma|psi|^2
     # Here we assume m=1 and potential V=0 for simplicity.
     diag_nl = gamma * np.abs(psi) ** 2
-    A = np.eye(n, dtype=complex) + 0.5j * dt * (
+    A = np.eye(n, dtype=dtype) + 0.5j * dt * (
         -0.5 * laplacian + np.diag(diag_nl)
     )
-    B = np.eye(n, dtype=complex) - 0.5j * dt * (
+    B = np.eye(n, dtype=dtype) - 0.5j * dt * (
         -0.5 * laplacian + np.diag(diag_nl)
     )
     rhs = B @ psi
@@ -61,11 +70,396 @@ def crank_nicolson_step(
     return psi_next
 
 
-def compute_momentum_expectation(psi: ArrayLike, dx: float) -> complex:
-    grad = np.gradient(psi, dx)
-    expectation = np.sum(np.conj(psi) * (-1j * grad)) * dx
-    return expectation
+def laplacian_bands(n: int, dx: float) -> np.ndarray:
+    """Build the 1D second-difference Laplacian in banded storage.
+
+    Parameters
+    ----------
+    n : int
+        Number of grid points.
+    dx : float
+        Grid spacing.
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape ``(3, n)`` laid out like ``scipy.linalg.solve_banded``
+        with ``(l, u) == (1, 1)``: row 0 holds the upper diagonal (first entry
+        unused), row 1 the main diagonal and row 2 the lower diagonal (last
+        entry unused).
+    """
+    bands = np.zeros((3, n))
+    bands[0, 1:] = 1.0
+    bands[1, :] = -2.0
+    bands[2, :-1] = 1.0
+    return bands / dx**2
+
+
+def banded_matvec(ab: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """Multiply a tridiagonal matrix in banded storage with ``x``.
+
+    ``ab`` has shape ``(3, ..., n)`` and broadcasts against ``x`` of shape
+    ``(..., n)``; the product is taken along the last axis.
+    """
+    y = ab[1] * x
+    y[..., :-1] += ab[0, ..., 1:] * x[..., 1:]
+    y[..., 1:] += ab[2, ..., :-1] * x[..., :-1]
+    return y
+
+
+def solve_tridiagonal(ab: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+    """Solve a tridiagonal system with parallel cyclic reduction.
+
+    Parameters
+    ----------
+    ab : np.ndarray
+        Matrix in banded storage of shape ``(3, ..., n)`` (see
+        :func:`laplacian_bands`). Leading axes broadcast against ``rhs``.
+    rhs : np.ndarray
+        Right-hand side of shape ``(..., n)``. Any leading axes are solved
+        independently in the same sweep.
+
+    Returns
+    -------
+    np.ndarray
+        Solution with the broadcast shape of ``ab[1]`` and ``rhs``.
+
+    Notes
+    -----
+    No pivoting is performed, so the matrix should be diagonally dominant.
+    The Crank-Nicolson matrices built by :func:`crank_nicolson_step_banded`
+    always are.
+
+    Every pass eliminates the couplings at the current stride from all rows
+    at once, so the solve takes ``ceil(log2(n))`` whole-array NumPy passes
+    (O(n log n) work) instead of a Python loop over the n rows. Rows are
+    padded on both sides with identity equations so that the shifted
+    neighbours never leave the arrays.
+    """
+    upper, diag, lower = ab[0], ab[1], ab[2]
+    n = rhs.shape[-1]
+    shape = np.broadcast_shapes(diag.shape, rhs.shape)
+    dtype = np.result_type(ab, rhs)
+    # largest stride used below; padding rows are 0 * x = 0 equations with
+    # a unit diagonal, which every pass leaves unchanged
+    pad = 1 << ((n - 1).bit_length() - 1) if n > 1 else 0
+    padded = shape[:-1] + (n + 2 * pad,)
+    inner = slice(pad, pad + n)
+    a = np.zeros(padded, dtype=dtype)
+    b = np.ones(padded, dtype=dtype)
+    c = np.zeros(padded, dtype=dtype)
+    d = np.zeros(padded, dtype=dtype)
+    a[..., pad + 1 : pad + n] = lower[..., : n - 1]
+    b[..., inner] = diag
+    c[..., pad : pad + n - 1] = upper[..., 1:]
+    d[..., inner] = rhs
+    stride = 1
+    while stride < n:
+        left = slice(pad - stride, pad - stride + n)
+        right = slice(pad + stride, pad + stride + n)
+        alpha = -a[..., inner] / b[..., left]
+        gamma = -c[..., inner] / b[..., right]
+        b_next = b[..., inner] + alpha * c[..., left] + gamma * a[..., right]
+        d_next = d[..., inner] + alpha * d[..., left] + gamma * d[..., right]
+        a_next = alpha * a[..., left]
+        c_next = gamma * c[..., right]
+        a[..., inner] = a_next
+        b[..., inner] = b_next
+        c[..., inner] = c_next
+        d[..., inner] = d_next
+        stride *= 2
+    return d[..., inner] / b[..., inner]
+
+
+def crank_nicolson_step_banded(
+    psi: np.ndarray,
+    laplacian: np.ndarray,
+    dt: float,
+    gamma: float | np.ndarray,
+    alpha: float | np.ndarray,
+    epsilon: float | np.ndarray,
+    momentum_expectation: complex | np.ndarray,
+) -> np.ndarray:
+    """Perform a single Crank-Nicolson step using banded storage.
+
+    Equivalent to :func:`crank_nicolson_step` but the Laplacian is kept as
+    three diagonals and the implicit system is solved with
+    :func:`solve_tridiagonal`, so a step costs O(n) time and memory instead
+    of O(n^3) and O(n^2).
+
+    Parameters
+    ----------
+    psi : np.ndarray
+        Current wave function samples of shape ``(n,)``, or ``(batch, n)``
+        to advance a stack of independent wave functions in one sweep.
+    laplacian : np.ndarray
+        Discrete Laplacian in banded storage, see :func:`laplacian_bands`.
+    dt : float
+        Time step.
+    gamma : float or np.ndarray
+        Nonlinearity coefficient. Arrays must broadcast against ``psi``,
+        e.g. shape ``(batch, 1)`` for per-member values.
+    alpha : float or np.ndarray
+        Chaos coefficient, broadcast like ``gamma``.
+    epsilon : float or np.ndarray
+        Chaos strength scaling, broadcast like ``gamma``.
+    momentum_expectation : complex or np.ndarray
+        Current expectation value of momentum operator, shape ``(batch, 1)``
+        for a stacked ``psi``.
+
+    Returns
+    -------
+    np.ndarray
+        Updated wave function.
+    """
+    # Banded Hamiltonian H = -(hbar^2/2m)L + gamma|psi|^2 with m=1, V=0;
+    # only the main diagonal depends on psi.
+    diag_nl = gamma * np.abs(psi) ** 2
+    kinetic = -0.5 * laplacian
+    ham = np.stack(np.broadcast_arrays(kinetic[0], kinetic[1] + diag_nl, kinetic[2]))
+    A = 0.5j * dt * ham
+    A[1] += 1.0
+    rhs = psi - 0.5j * dt * banded_matvec(ham, psi)
+    # chaos term: epsilon * alpha * (p - <p>)
+    grad = -1j * np.gradient(psi, axis=-1)
+    chaos = epsilon * alpha * (grad - momentum_expectation)
+    rhs += dt * chaos * psi
+    psi_next = solve_tridiagonal(A, rhs)
+    norm = np.linalg.norm(psi_next, axis=-1, keepdims=True)
+    np.divide(psi_next, norm, out=psi_next, where=norm > 0)
+    return psi_next
+
+
+def kron_sum_matvec(laplacians: Sequence[np.ndarray] | np.ndarray, psi: np.ndarray) -> np.ndarray:
+    """Apply the Kronecker-sum Laplacian ``sum_a I x .. x L_a x .. x I``.
+
+    ``laplacians`` holds one banded factor per spatial axis (see
+    :func:`laplacian_bands`), matching the trailing ``len(laplacians)`` axes
+    of ``psi``. The full operator on the flattened grid is never assembled;
+    only the ``3 * n`` entries of each factor are stored.
+    """
+    ndim = len(laplacians)
+    out = np.zeros(psi.shape, dtype=np.result_type(psi, *laplacians))
+    for a, lap in enumerate(laplacians):
+        axis = a - ndim
+        out += np.moveaxis(banded_matvec(lap, np.moveaxis(psi, axis, -1)), -1, axis)
+    return out
+
+
+def crank_nicolson_step_adi(
+    psi: np.ndarray,
+    laplacians: Sequence[np.ndarray] | np.ndarray,
+    dt: float,
+    gamma: float | np.ndarray,
+    alpha: float | np.ndarray,
+    epsilon: float | np.ndarray,
+    momentum_expectation: ArrayLike,
+) -> np.ndarray:
+    """Perform a Crank-Nicolson step on a 2D/3D grid by ADI splitting.
+
+    The Hamiltonian ``-L/2 + gamma|psi|^2`` with the Kronecker-sum
+    Laplacian of :func:`kron_sum_matvec` is split into one part per axis,
+    ``H_a = -L_a/2 + gamma|psi|^2 / d``. The Douglas-Gunn scheme then
+    replaces the implicit solve on the full grid by one tridiagonal sweep
+    (:func:`solve_tridiagonal`) along each axis, keeping second-order
+    accuracy at O(n^d) cost per step. With a single axis it reduces to
+    :func:`crank_nicolson_step_banded`.
+
+    Parameters
+    ----------
+    psi : np.ndarray
+        Current wave function on the grid; the trailing
+        ``len(laplacians)`` axes are spatial.
+    laplacians : sequence of np.ndarray
+        Banded Laplacian factor for each spatial axis, or one array of
+        shape ``(d, 3, n)``.
+    dt : float
+        Time step.
+    gamma : float or np.ndarray
+        Nonlinearity coefficient.
+    alpha : float or np.ndarray
+        Chaos coefficient.
+    epsilon : float or np.ndarray
+        Chaos strength scaling.
+    momentum_expectation : ArrayLike
+        Vector ``<p>`` with one component per spatial axis, as returned by
+        :func:`compute_momentum_expectation` with ``ndim=d``.
+
+    Returns
+    -------
+    np.ndarray
+        Updated wave function.
+    """
+    ndim = len(laplacians)
+    share = gamma * np.abs(psi) ** 2 / ndim
+    hams = []
+    h_psi = []
+    for a, lap in enumerate(laplacians):
+        # axis-a Hamiltonian in banded storage along the last axis
+        kinetic = -0.5 * lap
+        diag = kinetic[1] + np.moveaxis(share, a - ndim, -1)
+        ham = np.stack(np.broadcast_arrays(kinetic[0], diag, kinetic[2]))
+        hams.append(ham)
+        h_psi.append(banded_matvec(ham, np.moveaxis(psi, a - ndim, -1)))
+    rhs = psi - 0.5j * dt * np.moveaxis(h_psi[0], -1, -ndim)
+    for a in range(1, ndim):
+        rhs -= 1j * dt * np.moveaxis(h_psi[a], -1, a - ndim)
+    rhs += dt * _chaos(psi, epsilon, alpha, momentum_expectation, ndim) * psi
+    v = rhs
+    for a, ham in enumerate(hams):
+        A = 0.5j * dt * ham
+        A[1] += 1.0
+        moved = np.moveaxis(v, a - ndim, -1)
+        if a > 0:
+            moved = moved + 0.5j * dt * h_psi[a]
+        v = np.moveaxis(solve_tridiagonal(A, moved), -1, a - ndim)
+    spatial = tuple(range(-ndim, 0))
+    norm = np.sqrt(np.sum(np.abs(v) ** 2, axis=spatial, keepdims=True))
+    np.divide(v, norm, out=v, where=norm > 0)
+    return v
+
+
+def _chaos(
+    psi: np.ndarray,
+    epsilon: float | np.ndarray,
+    alpha: float | np.ndarray,
+    momentum_expectation: ArrayLike,
+    ndim: int,
+) -> np.ndarray:
+    """``epsilon * alpha * sum_a (p_a - <p_a>)`` on a ``ndim``-D grid."""
+    p = np.asarray(momentum_expectation)
+    total = np.zeros(psi.shape, dtype=np.result_type(psi, 1j))
+    for a in range(ndim):
+        # components broadcast against the spatial axes of psi
+        component = p[..., a].reshape(p.shape[:-1] + (1,) * ndim)
+        total += -1j * np.gradient(psi, axis=a - ndim) - component
+    return epsilon * alpha * total
+
+
+def kinetic_propagator(n: int, dx: float, dt: float, dims: int = 1) -> np.ndarray:
+    """Full-step kinetic propagator ``exp(-i dt |k|^2 / 2)`` on a periodic grid.
+
+    Parameters
+    ----------
+    n : int
+        Number of grid points per axis.
+    dx : float
+        Grid spacing.
+    dt : float
+        Time step.
+    dims : int
+        Number of spatial axes; the result has shape ``(n,) * dims``.
+
+    Returns
+    -------
+    np.ndarray
+        Phase factors in ``np.fft.fftn`` frequency order.
+    """
+    k = 2 * np.pi * np.fft.fftfreq(n, d=dx)
+    k2 = k**2
+    for a in range(1, dims):
+        k2 = k2[..., np.newaxis] + (k**2).reshape((1,) * a + (n,))
+    return np.exp(-0.5j * dt * k2)
+
+
+def split_step_fourier_step(
+    psi: np.ndarray,
+    propagator: np.ndarray,
+    dt: float,
+    gamma: float | np.ndarray,
+    alpha: float | np.ndarray,
+    epsilon: float | np.ndarray,
+    momentum_expectation: complex | np.ndarray,
+) -> np.ndarray:
+    """Perform a single Strang split-step Fourier step for 1D HUQCE.
+
+    The kinetic term is applied exactly in k-space with ``propagator`` (see
+    :func:`kinetic_propagator`), which assumes periodic boundaries, while
+    the ``gamma|psi|^2`` nonlinearity is applied as two half-step phases in
+    real space. The chaos term is added explicitly from the incoming state,
+    as in :func:`crank_nicolson_step`. A step costs O(n log n).
+
+    Parameters
+    ----------
+    psi : np.ndarray
+        Current wave function samples of shape ``(n,)`` or ``(batch, n)``,
+        or a ``d``-dimensional grid (optionally batched) when
+        ``propagator`` has ``d`` axes.
+    propagator : np.ndarray
+        Kinetic phase factors for ``dt``; its dimensionality sets the
+        number of trailing spatial axes of ``psi``.
+    dt : float
+        Time step.
+    gamma : float or np.ndarray
+        Nonlinearity coefficient, broadcast against ``psi``.
+    alpha : float or np.ndarray
+        Chaos coefficient, broadcast against ``psi``.
+    epsilon : float or np.ndarray
+        Chaos strength scaling, broadcast against ``psi``.
+    momentum_expectation : complex or np.ndarray
+        Current expectation value of momentum operator; a vector with one
+        component per spatial axis on multidimensional grids.
+
+    Returns
+    -------
+    np.ndarray
+        Updated wave function.
+    """
+    ndim = propagator.ndim
+    if ndim == 1:
+        # chaos term: epsilon * alpha * (p - <p>)
+        grad = -1j * np.gradient(psi, axis=-1)
+        chaos = epsilon * alpha * (grad - momentum_expectation)
+    else:
+        chaos = _chaos(psi, epsilon, alpha, momentum_expectation, ndim)
+    psi = psi + dt * chaos * psi
+    psi = np.exp(-0.5j * dt * gamma * np.abs(psi) ** 2) * psi
+    if ndim == 1:
+        psi = np.fft.ifft(propagator * np.fft.fft(psi, axis=-1), axis=-1)
+    else:
+        spatial = tuple(range(-ndim, 0))
+        psi = np.fft.ifftn(propagator * np.fft.fftn(psi, axes=spatial), axes=spatial)
+    psi_next = np.exp(-0.5j * dt * gamma * np.abs(psi) ** 2) * psi
+    if ndim == 1:
+        norm = np.linalg.norm(psi_next, axis=-1, keepdims=True)
+    else:
+        norm = np.sqrt(np.sum(np.abs(psi_next) ** 2, axis=spatial, keepdims=True))
+    np.divide(psi_next, norm, out=psi_next, where=norm > 0)
+    return psi_next
+
+
+def compute_momentum_expectation(psi: ArrayLike, dx: float, ndim: int = 1) -> complex | np.ndarray:
+    """Expectation value of momentum along the last axis of ``psi``.
+
+    A 1D ``psi`` yields a complex scalar; a ``(batch, n)`` stack yields one
+    value per row. With ``ndim > 1`` the trailing ``ndim`` axes are a grid
+    and the result is the momentum vector, with one component per axis in a
+    trailing axis of length ``ndim``.
+    """
+    if ndim == 1:
+        grad = np.gradient(psi, dx, axis=-1)
+        expectation = np.sum(np.conj(psi) * (-1j * grad), axis=-1) * dx
+        return expectation
+    psi = np.asarray(psi)
+    spatial = tuple(range(-ndim, 0))
+    components = [
+        np.sum(np.conj(psi) * (-1j * np.gradient(psi, dx, axis=axis)), axis=spatial) * dx**ndim
+        for axis in spatial
+    ]
+    return np.stack(components, axis=-1)
 
 
-__all__ = ["crank_nicolson_step", "compute_momentum_expectation"]
+__all__ = [
+    "SOLVER_VERSION",
+    "crank_nicolson_step",
+    "crank_nicolson_step_banded",
+    "crank_nicolson_step_adi",
+    "split_step_fourier_step",
+    "compute_momentum_expectation",
+    "kinetic_propagator",
+    "laplacian_bands",
+    "banded_matvec",
+    "kron_sum_matvec",
+    "solve_tridiagonal",
+]
 
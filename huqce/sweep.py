@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, fields, replace
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .analysis import spectral_entropy
+from .simulation import HuqceParams, HuqceSimulator
+
+
+@dataclass
+class SweepResult:
+    """Outcome of one simulation in a parameter sweep."""
+
+    index: int
+    params: HuqceParams
+    psi: np.ndarray
+    spectral_entropy: float
+    norm: float
+    seconds: float
+
+    def row(self) -> Dict[str, Any]:
+        """Flat record suitable for a results table (the state is omitted)."""
+        record: Dict[str, Any] = {"index": self.index}
+        record.update(asdict(self.params))
+        record.update(
+            spectral_entropy=self.spectral_entropy,
+            norm=self.norm,
+            seconds=self.seconds,
+        )
+        return record
+
+
+def param_grid(
+    base: Optional[HuqceParams] = None,
+    **ranges: Sequence[Any],
+) -> List[HuqceParams]:
+    """Cartesian product of ``ranges`` applied on top of ``base``.
+
+    >>> len(param_grid(gamma=[0.0, 0.1], steps=[10, 20, 30]))
+    6
+    """
+    base = base or HuqceParams()
+    names = list(ranges)
+    unknown = set(names) - {f.name for f in fields(HuqceParams)}
+    if unknown:
+        raise ValueError(f"unknown HuqceParams fields: {sorted(unknown)}")
+    return [
+        replace(base, **dict(zip(names, values)))
+        for values in itertools.product(*(ranges[name] for name in names))
+    ]
+
+
+def load_sweep(path: Union[str, Path]) -> List[HuqceParams]:
+    """Read a sweep definition from JSON.
+
+    The file holds either a list of ``HuqceParams`` keyword dicts, or an
+    object ``{"base": {...}, "grid": {"field": [values, ...], ...}}`` that is
+    expanded with :func:`param_grid`.
+    """
+    data = json.loads(Path(path).read_text())
+    if isinstance(data, list):
+        return [HuqceParams(**item) for item in data]
+    base = HuqceParams(**data.get("base", {}))
+    return param_grid(base, **data.get("grid", {}))
+
+
+def parse_range(spec: str) -> Dict[str, List[Any]]:
+    """Parse a CLI range such as ``gamma=0,0.01,0.1`` into ``{name: values}``.
+
+    Values are cast to the type of the matching ``HuqceParams`` default.
+    """
+    name, sep, values = spec.partition("=")
+    name = name.strip()
+    defaults = asdict(HuqceParams())
+    if not sep or name not in defaults:
+        raise ValueError(f"expected FIELD=V1,V2,... with a HuqceParams field, got {spec!r}")
+    # optional fields default to None and take floats
+    kind = float if defaults[name] is None else type(defaults[name])
+
+    def cast(text: str) -> Any:
+        text = text.strip()
+        if kind is bool:
+            return text.lower() in ("1", "true", "yes", "on")
+        return kind(text)
+
+    return {name: [cast(v) for v in values.split(",") if v.strip()]}
+
+
+def _simulate(index: int, params: HuqceParams) -> SweepResult:
+    start = time.perf_counter()
+    psi = HuqceSimulator(params).run()
+    return SweepResult(
+        index=index,
+        params=params,
+        psi=psi,
+        spectral_entropy=spectral_entropy(psi),
+        norm=float(np.linalg.norm(psi)),
+        seconds=time.perf_counter() - start,
+    )
+
+
+def run_sweep(
+    params_list: Iterable[HuqceParams],
+    workers: Optional[int] = None,
+) -> Iterator[SweepResult]:
+    """Run every configuration and yield results as they finish.
+
+    Parameters
+    ----------
+    params_list : Iterable[HuqceParams]
+        Configurations to simulate. ``SweepResult.index`` refers to the
+        position in this sequence, since completion order is arbitrary.
+    workers : int, optional
+        Size of the process pool; defaults to ``os.cpu_count()``. With
+        ``workers=1`` everything runs in the calling process.
+
+    Yields
+    ------
+    SweepResult
+        One result per configuration, in completion order.
+    """
+    jobs = list(enumerate(params_list))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        for index, params in jobs:
+            yield _simulate(index, params)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        futures = [pool.submit(_simulate, index, params) for index, params in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def results_header() -> List[str]:
+    """Column names of :meth:`SweepResult.row`."""
+    return ["index", *asdict(HuqceParams()), "spectral_entropy", "norm", "seconds"]
+
+
+__all__ = [
+    "SweepResult",
+    "param_grid",
+    "load_sweep",
+    "parse_range",
+    "run_sweep",
+    "results_header",
+]
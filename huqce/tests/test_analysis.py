@@ -1,5 +1,5 @@
 import numpy as np
-from huqce.analysis import spectral_entropy
+from huqce.analysis import spectral_entropies, spectral_entropy
 
 
 def test_spectral_entropy_constant():
@@ -13,3 +13,47 @@ def test_spectral_entropy_random():
     sig = np.random.randn(128)
     ent = spectral_entropy(sig)
     assert ent > 0
+
+
+def test_spectral_entropy_uses_all_axes():
+    grid = np.arange(8)
+    wave = np.exp(2j * np.pi * (grid[:, None] + 3 * grid[None, :]) / 8)
+    assert spectral_entropy(wave) < 1e-6
+
+
+def test_spectral_entropies_match_loop():
+    rng = np.random.default_rng(0)
+    real = rng.standard_normal((5, 33))
+    complex_traj = real[:, :32] + 1j * rng.standard_normal((5, 32))
+    for traj in (real, real[:, :32], complex_traj):
+        expected = [spectral_entropy(row) for row in traj]
+        assert np.allclose(spectral_entropies(traj, chunk_size=2), expected)
+    assert np.allclose(spectral_entropies(real.T, axis=0), spectral_entropies(real))
+    assert spectral_entropies(np.zeros((2, 8))).tolist() == [0.0, 0.0]
+
+
+def test_spectral_entropies_memmap_and_welch(tmp_path):
+    rng = np.random.default_rng(1)
+    traj = np.lib.format.open_memmap(tmp_path / "traj.npy", mode="w+", dtype=complex, shape=(7, 64))
+    traj[:] = rng.standard_normal((7, 64)) + 1j * rng.standard_normal((7, 64))
+    whole = spectral_entropies(traj, window="hann")
+    assert whole.shape == (7,)
+    welch = spectral_entropies(np.load(tmp_path / "traj.npy", mmap_mode="r"), window="hann", segment=16, chunk_size=3)
+    segments = np.lib.stride_tricks.sliding_window_view(traj[0], 16)[::8] * np.hanning(16)
+    power = (np.abs(np.fft.fft(segments, axis=-1)) ** 2).mean(axis=0)
+    prob = power / power.sum()
+    assert np.isclose(welch[0], -np.sum(prob * np.log(prob + 1e-12)))
+    assert np.all(welch <= np.log(16) + 1e-9)
+
+
+def test_spectral_entropies_of_recorded_2d_trajectory(tmp_path):
+    from huqce.recorder import load_trajectory
+    from huqce.simulation import HuqceParams, HuqceSimulator
+
+    path = tmp_path / "traj.npy"
+    HuqceSimulator(HuqceParams(n=8, dims=2, steps=4, method="split_step")).run(record=path, every=2)
+    frames, params, _ = load_trajectory(path)
+    assert frames.ndim == 3
+    for traj in (frames, np.abs(frames)):
+        entropies = spectral_entropies(traj, chunk_size=2, ndim=params.dims)
+        assert np.allclose(entropies, [spectral_entropy(frame) for frame in traj])
@@ -0,0 +1,52 @@
+import os
+
+import numpy as np
+from huqce.cache import ResultCache, params_key
+from huqce.simulation import HuqceParams, HuqceSimulator
+
+
+def test_cache_hit_returns_stored_state(tmp_path, monkeypatch):
+    cache = ResultCache(tmp_path)
+    params = HuqceParams(n=16, steps=3)
+    assert params_key(params) == params_key(HuqceParams(n=16, steps=3))
+    assert params_key(params) != params_key(HuqceParams(n=16, steps=4))
+    first = cache.run(params)
+    assert np.array_equal(first, HuqceSimulator(params).run())
+
+    def fail(self):
+        raise AssertionError("cache miss")
+
+    monkeypatch.setattr(HuqceSimulator, "run", fail)
+    assert np.array_equal(cache.run(params), first)
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    entry = np.zeros(16, dtype=complex)
+    size = len(entry.tobytes()) + 128
+    cache = ResultCache(tmp_path, max_bytes=2 * size)
+    a, b, c = (HuqceParams(n=16, steps=s) for s in (1, 2, 3))
+    cache.put(a, entry)
+    cache.put(b, entry)
+    os.utime(cache.path(a), (0, 0))
+    os.utime(cache.path(b), (1, 1))
+    assert cache.get(a) is not None  # refreshes a
+    cache.put(c, entry)
+    assert cache.get(b) is None
+    assert cache.get(a) is not None
+    assert cache.get(c) is not None
+
+
+def test_cache_hit_survives_concurrent_eviction(tmp_path, monkeypatch):
+    cache = ResultCache(tmp_path)
+    params = HuqceParams(n=16, steps=1)
+    entry = np.arange(16, dtype=complex)
+    cache.put(params, entry)
+    load = np.load
+
+    def load_then_evict(path, *args, **kwargs):
+        psi = load(path, *args, **kwargs)
+        os.unlink(path)
+        return psi
+
+    monkeypatch.setattr(np, "load", load_then_evict)
+    assert np.array_equal(cache.get(params), entry)
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from huqce.checkpoint import load_checkpoint
+from huqce.recorder import load_trajectory
+from huqce.simulation import HuqceParams, HuqceSimulator
+
+
+class Preempted(Exception):
+    pass
+
+
+def test_resume_matches_uninterrupted_run(tmp_path, monkeypatch):
+    params = HuqceParams(n=16, steps=10, banded=True)
+    expected = HuqceSimulator(params).run()
+    ckpt = tmp_path / "ckpt.npz"
+    traj = tmp_path / "traj.npy"
+
+    sim = HuqceSimulator(params)
+    original_step = sim.step
+
+    def step_then_die():
+        original_step()
+        if sim.step_count == 7:
+            raise Preempted
+
+    monkeypatch.setattr(sim, "step", step_then_die)
+    with pytest.raises(Preempted):
+        sim.run(record=traj, checkpoint=ckpt, checkpoint_every=3)
+    assert load_checkpoint(ckpt).step == 6
+
+    resumed = HuqceSimulator.resume(ckpt)
+    assert resumed.step_count == 6
+    final = resumed.run(record=traj, checkpoint=ckpt, checkpoint_every=3)
+    assert np.array_equal(final, expected)
+    assert load_checkpoint(ckpt).step == 10
+    frames, _, meta = load_trajectory(traj)
+    assert meta["recorded"] == 11
+    assert np.array_equal(frames[-1], expected)
+    # resuming a finished run does nothing
+    assert np.array_equal(HuqceSimulator.resume(ckpt).run(), expected)
+    assert list(tmp_path.glob("*.tmp")) == []
@@ -0,0 +1,40 @@
+import numpy as np
+from huqce.ensemble import HuqceEnsemble
+from huqce.simulation import HuqceParams, HuqceSimulator
+
+
+def test_ensemble_bit_compatible_with_members():
+    params = HuqceParams(n=32, steps=5)
+    rng = np.random.default_rng(0)
+    psi0 = rng.standard_normal((3, 32)) + 1j * rng.standard_normal((3, 32))
+    ens = HuqceEnsemble(params, psi0=psi0, gamma=[0.0, 0.01, 0.5], alpha=[0.005, 0.1, 0.0])
+    result = ens.run()
+    assert result.shape == (3, 32)
+    for i in range(len(ens)):
+        sim = HuqceSimulator(ens.member_params(i))
+        sim.psi = psi0[i].astype(complex)
+        assert np.array_equal(sim.run(), result[i])
+
+
+def test_ensemble_default_state():
+    ens = HuqceEnsemble(HuqceParams(n=16, steps=2), epsilon=np.linspace(0, 1, 4))
+    assert ens.psi.shape == (4, 16)
+    assert np.allclose(np.linalg.norm(ens.run(), axis=1), 1.0)
+
+
+def test_split_step_ensemble_bit_compatible():
+    params = HuqceParams(n=32, steps=5, method="split_step")
+    ens = HuqceEnsemble(params, gamma=[0.0, 0.3])
+    result = ens.run()
+    for i in range(len(ens)):
+        assert np.array_equal(HuqceSimulator(ens.member_params(i)).run(), result[i])
+
+
+def test_complex64_ensemble_matches_single_runs():
+    params = HuqceParams(n=32, steps=20, dtype="complex64")
+    ensemble = HuqceEnsemble(params, gamma=[0.0, 0.5])
+    result = ensemble.run()
+    assert result.dtype == np.complex64
+    for index in range(2):
+        single = HuqceSimulator(ensemble.member_params(index)).run()
+        assert np.allclose(result[index], single, atol=1e-6)
@@ -0,0 +1,32 @@
+import numpy as np
+from huqce.recorder import load_trajectory
+from huqce.simulation import HuqceParams, HuqceSimulator
+
+
+def test_record_every_k_steps(tmp_path):
+    params = HuqceParams(n=16, steps=10, banded=True)
+    path = tmp_path / "traj.npy"
+    final = HuqceSimulator(params).run(record=path, every=3)
+    frames, loaded, meta = load_trajectory(path)
+    assert isinstance(frames, np.memmap)
+    assert frames.shape == (4, 16)
+    assert loaded == params
+    assert meta["recorded"] == 4
+    reference = HuqceSimulator(params)
+    assert np.array_equal(frames[0], reference.psi)
+    for frame in frames[1:]:
+        for _ in range(3):
+            reference.step()
+        assert np.array_equal(frame, reference.psi)
+    reference.step()
+    assert np.array_equal(final, reference.psi)
+
+
+def test_record_2d_grid(tmp_path):
+    params = HuqceParams(n=8, steps=2, dims=2)
+    path = tmp_path / "traj.npy"
+    final = HuqceSimulator(params).run(record=path)
+    frames, loaded, _ = load_trajectory(path)
+    assert frames.shape == (3, 8, 8)
+    assert loaded.dims == 2
+    assert np.array_equal(frames[-1], final)
@@ -1,3 +1,5 @@
+import pytest
+from dataclasses import replace
 import numpy as np
 import warnings
 from numpy.exceptions import ComplexWarning
@@ -20,3 +22,104 @@ def test_momentum_expectation_type():
         warnings.filterwarnings("error", category=ComplexWarning)
         val = compute_momentum_expectation(psi, 1.0)
     assert np.iscomplexobj(val)
+
+
+def test_banded_matches_dense():
+    dense = HuqceSimulator(HuqceParams(n=64, steps=20)).run()
+    banded_sim = HuqceSimulator(HuqceParams(n=64, steps=20, banded=True))
+    assert banded_sim.laplacian.shape == (3, 64)
+    banded = banded_sim.run()
+    assert np.allclose(banded, dense, atol=1e-10)
+
+
+def _gaussian_packet(n, dx):
+    x = np.arange(n) * dx
+    psi = np.exp(-((x - n * dx / 2) ** 2) / 2.0).astype(complex)
+    return psi / np.linalg.norm(psi)
+
+
+def test_split_step_matches_crank_nicolson():
+    # a packet far from the boundaries does not feel periodic vs. fixed ends
+    base = dict(n=64, dx=0.2, dt=0.01, steps=40, gamma=0.5)
+    finals = {}
+    for method in ("crank_nicolson", "split_step"):
+        sim = HuqceSimulator(HuqceParams(method=method, banded=True, **base))
+        sim.psi = _gaussian_packet(64, 0.2)
+        finals[method] = sim.run()
+    assert abs(np.linalg.norm(finals["split_step"]) - 1.0) < 1e-12
+    assert np.linalg.norm(finals["split_step"] - finals["crank_nicolson"]) < 5e-3
+
+
+def test_multidimensional_runs_stay_normalised():
+    for dims, method in ((2, "crank_nicolson"), (2, "split_step"), (3, "crank_nicolson")):
+        sim = HuqceSimulator(HuqceParams(n=12, dims=dims, steps=3, method=method))
+        psi = sim.run()
+        assert psi.shape == (12,) * dims
+        assert np.isclose(np.linalg.norm(psi), 1.0)
+        assert np.all(np.isfinite(psi))
+
+
+def test_adaptive_run_reaches_end_time_in_few_steps():
+    base = dict(n=64, dx=0.1, method="split_step")
+    reference = HuqceSimulator(HuqceParams(dt=1e-3, steps=1000, **base)).run()
+    sim = HuqceSimulator(HuqceParams(dt=0.01, adaptive=True, t_end=1.0, rtol=1e-4, atol=1e-8, **base))
+    psi = sim.run()
+    assert sim.time == 1.0
+    assert sim.accepted_steps < 20
+    assert np.abs(psi - reference).max() < 1e-4
+
+
+def test_adaptive_clipped_step_keeps_proposal():
+    base = dict(n=64, dx=0.1, method="split_step", rtol=1e-4, atol=1e-8)
+    sim = HuqceSimulator(HuqceParams(dt=0.01, adaptive=True, t_end=1.0, **base))
+    sim.run()
+    proposal = sim.dt
+    sim.run_adaptive(t_end=1.0 + 1e-7)
+    assert sim.dt >= proposal
+    steps = sim.accepted_steps
+    sim.run_adaptive(t_end=2.0)
+    assert sim.accepted_steps - steps < 20
+
+
+def test_adaptive_run_rejects_steps_when_nonlinearity_is_large():
+    params = HuqceParams(n=64, dx=0.1, dt=0.5, gamma=5.0, banded=True, adaptive=True, t_end=0.5, rtol=1e-4)
+    sim = HuqceSimulator(params)
+    sim.run()
+    assert sim.rejected_steps > 0
+    assert np.isclose(sim.time, 0.5)
+    assert np.isclose(np.linalg.norm(sim.psi), 1.0)
+    with pytest.raises(ValueError):
+        HuqceSimulator(params).run(record="unused.npy")
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"banded": True},
+        {"method": "split_step"},
+        {"dims": 2, "n": 24},
+        {"dims": 2, "n": 24, "method": "split_step"},
+        {"adaptive": True, "t_end": 0.1, "banded": True},
+    ],
+)
+def test_complex64_stays_single_precision_and_close_to_complex128(options):
+    options = dict(options)
+    params = HuqceParams(n=options.pop("n", 48), steps=100, **options)
+    single = HuqceSimulator(replace(params, dtype="complex64"))
+    assert single.psi.dtype == np.complex64
+    for operator in (single.laplacian, single.propagator):
+        assert operator is None or operator.dtype in (np.float32, np.complex64)
+    if not params.adaptive:
+        for _ in range(3):
+            single.step()
+            assert single.psi.dtype == np.complex64
+    single = HuqceSimulator(replace(params, dtype="complex64"))
+    drift = np.abs(single.run() - HuqceSimulator(params).run()).max()
+    assert single.psi.dtype == np.complex64
+    assert drift < 5e-6
+
+
+def test_unknown_dtype_rejected():
+    with pytest.raises(ValueError):
+        HuqceSimulator(HuqceParams(dtype="complex256"))
@@ -0,0 +1,92 @@
+import numpy as np
+from huqce.simulation import HuqceParams, HuqceSimulator
+from huqce.solver import (
+    banded_matvec,
+    compute_momentum_expectation,
+    crank_nicolson_step_adi,
+    crank_nicolson_step_banded,
+    kron_sum_matvec,
+    laplacian_bands,
+    solve_tridiagonal,
+)
+
+
+def _dense(ab):
+    return np.diag(ab[1]) + np.diag(ab[0, 1:], 1) + np.diag(ab[2, :-1], -1)
+
+
+def test_solve_tridiagonal_matches_dense():
+    rng = np.random.default_rng(0)
+    n = 16
+    ab = rng.standard_normal((3, n)) + 1j * rng.standard_normal((3, n))
+    ab[1] += 4.0
+    rhs = rng.standard_normal(n) + 1j * rng.standard_normal(n)
+    x = solve_tridiagonal(ab, rhs)
+    assert np.allclose(x, np.linalg.solve(_dense(ab), rhs))
+    assert np.allclose(banded_matvec(ab, x), rhs)
+
+
+def test_solve_tridiagonal_non_power_of_two_and_batched():
+    rng = np.random.default_rng(1)
+    for n in (1, 2, 3, 7, 33):
+        ab = rng.standard_normal((3, n)) + 1j * rng.standard_normal((3, n))
+        ab[1] += 4.0
+        rhs = rng.standard_normal((5, n)) + 1j * rng.standard_normal((5, n))
+        x = solve_tridiagonal(ab, rhs)
+        assert np.allclose(x, np.linalg.solve(_dense(ab), rhs.T).T)
+        assert np.array_equal(x[2], solve_tridiagonal(ab, rhs[2]))
+
+
+def test_laplacian_bands_matches_dense():
+    ab = laplacian_bands(5, 0.5)
+    off = np.ones(4)
+    lap = (np.diag(-2 * np.ones(5)) + np.diag(off, 1) + np.diag(off, -1)) / 0.5**2
+    assert np.array_equal(_dense(ab), lap)
+
+
+def test_kron_sum_matvec_matches_dense_kronecker_sum():
+    rng = np.random.default_rng(2)
+    lap = laplacian_bands(5, 0.1)
+    eye = np.eye(5)
+    dense = np.kron(_dense(lap), eye) + np.kron(eye, _dense(lap))
+    psi = rng.standard_normal((5, 5)) + 1j * rng.standard_normal((5, 5))
+    assert np.allclose(kron_sum_matvec([lap, lap], psi).ravel(), dense @ psi.ravel())
+
+
+def test_adi_single_axis_is_banded_crank_nicolson():
+    rng = np.random.default_rng(3)
+    psi = rng.standard_normal(16) + 1j * rng.standard_normal(16)
+    psi /= np.linalg.norm(psi)
+    lap = laplacian_bands(16, 0.1)
+    p_exp = compute_momentum_expectation(psi, 0.1)
+    expected = crank_nicolson_step_banded(psi, lap, 0.01, 0.1, 0.005, 0.1, p_exp)
+    assert np.array_equal(crank_nicolson_step_adi(psi, [lap], 0.01, 0.1, 0.005, 0.1, [p_exp]), expected)
+
+
+def test_adi_converges_to_dense_crank_nicolson_2d():
+    n, dx = 10, 0.1
+    lap = laplacian_bands(n, dx)
+    eye = np.eye(n)
+    ham = -0.5 * (np.kron(_dense(lap), eye) + np.kron(eye, _dense(lap)))
+    psi = HuqceSimulator(HuqceParams(n=n, dims=2)).psi * np.exp(1j * np.arange(n))[:, None]
+    psi /= np.linalg.norm(psi)
+    errors = []
+    for dt in (0.01, 0.005):
+        exact = np.linalg.solve(np.eye(n * n) + 0.5j * dt * ham, psi.ravel() - 0.5j * dt * ham @ psi.ravel())
+        exact /= np.linalg.norm(exact)
+        step = crank_nicolson_step_adi(psi, [lap, lap], dt, 0.0, 0.0, 0.0, [0.0, 0.0])
+        errors.append(np.abs(step.ravel() - exact).max())
+    # the splitting error is third order per step
+    assert errors[0] < 5e-3 and errors[1] < errors[0] / 4
+
+
+def test_momentum_expectation_vector():
+    n, dx = 32, 0.1
+    x = np.arange(n) * dx
+    psi = np.exp(1j * 2.0 * x)[:, None] * np.exp(-1j * 3.0 * x)[None, :]
+    psi /= np.sqrt(np.sum(np.abs(psi) ** 2) * dx**2)
+    p = compute_momentum_expectation(psi, dx, ndim=2)
+    assert p.shape == (2,)
+    assert np.allclose(p.real, [2.0, -3.0], atol=0.05)
+    batched = compute_momentum_expectation(np.stack([psi, psi]), dx, ndim=2)
+    assert batched.shape == (2, 2) and np.allclose(batched[1], p)
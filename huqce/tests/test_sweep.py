@@ -0,0 +1,23 @@
+import json
+
+from huqce.simulation import HuqceParams, HuqceSimulator
+from huqce.sweep import load_sweep, param_grid, parse_range, run_sweep
+
+
+def test_param_grid_and_json(tmp_path):
+    grid = param_grid(HuqceParams(n=16), gamma=[0.0, 0.1], steps=[1, 2, 3])
+    assert len(grid) == 6
+    assert all(p.n == 16 for p in grid)
+    path = tmp_path / "sweep.json"
+    path.write_text(json.dumps({"base": {"n": 16}, "grid": {"gamma": [0.0, 0.1], "steps": [1, 2, 3]}}))
+    assert load_sweep(path) == grid
+    assert parse_range("steps=1,2") == {"steps": [1, 2]}
+
+
+def test_run_sweep_parallel_matches_serial():
+    grid = param_grid(HuqceParams(n=16, steps=3), gamma=[0.0, 0.05, 0.1, 0.2])
+    results = sorted(run_sweep(grid, workers=2), key=lambda r: r.index)
+    assert [r.index for r in results] == [0, 1, 2, 3]
+    for result, params in zip(results, grid):
+        assert result.params == params
+        assert (result.psi == HuqceSimulator(params).run()).all()